@@ -16,6 +16,9 @@ try:
 except ImportError:
     pass  # dotenv is optional
 
+# Response token cap applied when max_tokens isn't configured
+DEFAULT_MAX_TOKENS = 4096
+
 
 @dataclass
 class LLMConfig:
@@ -27,7 +30,11 @@ class LLMConfig:
     # Model settings
     model: str = "anthropic.claude-3-5-sonnet-20241022-v2:0"  # Default model
     temperature: float = 0.1  # Model creativity (0.0-1.0)
-    max_tokens: Optional[int] = None  # Max response tokens
+    max_tokens: Optional[int] = None  # Max response tokens (DEFAULT_MAX_TOKENS if unset)
+    
+    # Request limits so a stalled call can't hang a worker
+    timeout: float = 60.0  # Seconds per request
+    max_retries: int = 3
     
     # OpenAI specific
     openai_api_key: Optional[str] = None
@@ -59,11 +66,17 @@ class LLMConfig:
         max_tokens_env = os.getenv('AI_MAX_TOKENS', os.getenv('LLM_MAX_TOKENS'))
         max_tokens = int(max_tokens_env) if max_tokens_env else None
 
+        # Support both AI_TIMEOUT/LLM_TIMEOUT and AI_MAX_RETRIES/LLM_MAX_RETRIES
+        timeout = float(os.getenv('AI_TIMEOUT', os.getenv('LLM_TIMEOUT', '60')))
+        max_retries = int(os.getenv('AI_MAX_RETRIES', os.getenv('LLM_MAX_RETRIES', '3')))
+
         config = cls(
             provider=provider,
             model=model or 'anthropic.claude-3-5-sonnet-20241022-v2:0',
             temperature=temperature,
             max_tokens=max_tokens,
+            timeout=timeout,
+            max_retries=max_retries,
 
             # OpenAI
             openai_api_key=os.getenv('OPENAI_API_KEY'),
@@ -124,7 +137,7 @@ class LLMConfig:
             'credentials_profile_name': self.aws_profile,
             'model_kwargs': {
                 'temperature': self.temperature,
-                'max_tokens': self.max_tokens or 4096,
+                'max_tokens': self.max_tokens or DEFAULT_MAX_TOKENS,
             }
         }
     
@@ -134,9 +147,10 @@ class LLMConfig:
             'model': self.model,
             'temperature': self.temperature,
             'api_key': self.openai_api_key,
+            'max_tokens': self.max_tokens or DEFAULT_MAX_TOKENS,
+            'timeout': self.timeout,
+            'max_retries': self.max_retries,
         }
-        if self.max_tokens:
-            kwargs['max_tokens'] = self.max_tokens
         return kwargs
     
     def get_anthropic_kwargs(self) -> Dict[str, Any]:
@@ -145,9 +159,10 @@ class LLMConfig:
             'model': self.model,
             'temperature': self.temperature,
             'api_key': self.anthropic_api_key,
+            'max_tokens': self.max_tokens or DEFAULT_MAX_TOKENS,
+            'timeout': self.timeout,
+            'max_retries': self.max_retries,
         }
-        if self.max_tokens:
-            kwargs['max_tokens'] = self.max_tokens
         return kwargs
     
     def get_google_kwargs(self) -> Dict[str, Any]:
@@ -156,9 +171,10 @@ class LLMConfig:
             'model': self.model,
             'temperature': self.temperature,
             'api_key': self.google_api_key,
+            'max_tokens': self.max_tokens or DEFAULT_MAX_TOKENS,
+            'timeout': self.timeout,
+            'max_retries': self.max_retries,
         }
-        if self.max_tokens:
-            kwargs['max_tokens'] = self.max_tokens
         return kwargs
 
 
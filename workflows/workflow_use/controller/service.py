@@ -309,7 +309,7 @@ class WorkflowController(Controller):
 					input_tokens = len(formatted_prompt.split()) * 1.3
 					output_tokens = len(output.content.split()) * 1.3
 					model_name = getattr(page_extraction_llm, 'model_name', 'page-extraction-llm')
-					track_llm_call(model_name, int(input_tokens), int(output_tokens))
+					track_llm_call(model_name, int(input_tokens), int(output_tokens), return_usage=False)
 					logger.debug(f"Tracked page extraction: {int(input_tokens + output_tokens)} tokens")
 				except Exception as e:
 					logger.debug(f"Token tracking failed for page extraction: {e}")
@@ -10,7 +10,7 @@ from browser_use import Agent as BrowserAgent, Browser
 from langchain_core.language_models.chat_models import BaseChatModel
 
 from workflow_use.workflow.service import Workflow
-from workflow_use.smart_test.browser_prompts import generate_browser_task
+from workflow_use.smart_test.browser_prompts import generate_browser_task_messages
 from workflow_use.hybrid.simple_capture import SimpleWorkflowCapture
 from workflow_use.schema.views import WorkflowStep
 
@@ -90,7 +90,7 @@ class FallbackManager:
                 return False, None, None
             
             # Create browser-use task for this specific step
-            browser_task = generate_browser_task(step_gherkin, "stop_on_assertion")
+            browser_rules, browser_task = generate_browser_task_messages(step_gherkin, "stop_on_assertion")
 
             # Track tokens before browser-use fallback
             try:
@@ -103,6 +103,7 @@ class FallbackManager:
             # Execute with browser-use agent
             browser_agent = BrowserAgent(
                 task=browser_task,
+                extend_system_message=browser_rules,
                 llm=self.llm,
                 browser_session=self.browser or workflow.browser,
                 use_vision=True
@@ -122,13 +123,13 @@ class FallbackManager:
                         # Estimate input/output split for fallback
                         estimated_input = int(real_tokens * 0.75)
                         estimated_output = int(real_tokens * 0.25)
-                        token_tracker.track_llm_call(model_name, estimated_input, estimated_output)
+                        token_tracker.track_llm_call_inplace(model_name, estimated_input, estimated_output)
                         logger.info(f"Tracked browser-use fallback: {real_tokens} tokens for step {step_index}")
                     else:
                         # Fallback to estimation if real extraction fails
-                        estimated_tokens = len(browser_task.split()) * 8  # Higher estimate for fallback
+                        estimated_tokens = (len(browser_task.split()) + len(browser_rules.split())) * 8  # Higher estimate for fallback
                         model_name = getattr(self.llm, 'model_name', 'browser-use-fallback')
-                        token_tracker.track_llm_call(model_name, int(estimated_tokens * 0.7), int(estimated_tokens * 0.3))
+                        token_tracker.track_llm_call_inplace(model_name, int(estimated_tokens * 0.7), int(estimated_tokens * 0.3))
                         logger.info(f"Tracked browser-use fallback (estimated): {estimated_tokens} tokens for step {step_index}")
             except Exception as e:
                 logger.error(f"Error in browser-use fallback: {e}")
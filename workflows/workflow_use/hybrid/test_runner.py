@@ -13,7 +13,7 @@ from browser_use import Agent as BrowserAgent, Browser
 from langchain_core.language_models.chat_models import BaseChatModel
 
 from workflow_use.smart_test.gherkin_processor import process_txt_to_gherkin
-from workflow_use.smart_test.browser_prompts import generate_browser_task
+from workflow_use.smart_test.browser_prompts import generate_browser_task_messages
 from workflow_use.smart_test.step_tracker import StepTracker
 from workflow_use.workflow.service import Workflow
 from workflow_use.hybrid.simple_capture import SimpleWorkflowCapture
@@ -348,7 +348,7 @@ class HybridTestRunner:
 
             # Track the real tokens if we found any
             if input_tokens > 0 or output_tokens > 0:
-                self.token_tracker.track_llm_call(f"{model_name}-real", input_tokens, output_tokens)
+                self.token_tracker.track_llm_call_inplace(f"{model_name}-real", input_tokens, output_tokens)
                 logger.info(f"🎯 REAL {llm_type} tokens tracked via {method}: {input_tokens} input + {output_tokens} output = {total_tokens} total")
                 return True
             else:
@@ -385,7 +385,7 @@ class HybridTestRunner:
 
             # Track the real tokens if we found any
             if input_tokens > 0 or output_tokens > 0:
-                self.token_tracker.track_llm_call(f"{model_name}-real", input_tokens, output_tokens)
+                self.token_tracker.track_llm_call_inplace(f"{model_name}-real", input_tokens, output_tokens)
                 logger.info(f"🎯 REAL {llm_type} tokens tracked via {method}: {input_tokens} input + {output_tokens} output = {input_tokens + output_tokens} total")
                 return True
             else:
@@ -414,7 +414,7 @@ class HybridTestRunner:
 
             # Track the tokens if we found any
             if input_tokens > 0 or output_tokens > 0:
-                self.token_tracker.track_llm_call(model_name, input_tokens, output_tokens)
+                self.token_tracker.track_llm_call_inplace(model_name, input_tokens, output_tokens)
                 logger.info(f"Tracked {llm_type} tokens from LLM output: {input_tokens} input + {output_tokens} output = {input_tokens + output_tokens} total")
             else:
                 logger.debug(f"No token usage found in {llm_type} LLM output")
@@ -475,7 +475,7 @@ class HybridTestRunner:
                     tracking_suffix = "-enhanced"
                     accuracy_msg = "ENHANCED"
 
-                self.token_tracker.track_llm_call(f"{model_name}{tracking_suffix}", estimated_input, estimated_output)
+                self.token_tracker.track_llm_call_inplace(f"{model_name}{tracking_suffix}", estimated_input, estimated_output)
                 logger.info(f"🎯 {accuracy_msg} browser-use tokens: {total_tokens} total ({estimated_input} input + {estimated_output} output)")
 
             else:
@@ -499,7 +499,7 @@ class HybridTestRunner:
                 estimated_input = int(estimated_total * 0.7)
                 estimated_output = int(estimated_total * 0.3)
 
-                self.token_tracker.track_llm_call(f"{model_name}-estimated", estimated_input, estimated_output)
+                self.token_tracker.track_llm_call_inplace(f"{model_name}-estimated", estimated_input, estimated_output)
                 logger.info(f"Added basic estimated browser-use tokens: {estimated_input} input + {estimated_output} output = {estimated_total} total")
             else:
                 logger.info(f"Tokens already tracked: {current_total} total tokens")
@@ -584,10 +584,11 @@ class HybridTestRunner:
 
             # Step 2: Execute with browser-use
             logger.info("Executing Gherkin scenario with browser-use")
-            browser_task = generate_browser_task(gherkin_scenario, "stop_on_assertion")
+            browser_rules, browser_task = generate_browser_task_messages(gherkin_scenario, "stop_on_assertion")
 
             browser_agent = BrowserAgent(
                 task=browser_task,
+                extend_system_message=browser_rules,
                 llm=self.llm,
                 browser_session=self.browser,
                 use_vision=True
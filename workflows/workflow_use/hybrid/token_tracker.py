@@ -4,72 +4,104 @@ Tracks LLM token usage and costs across both browser-use and workflow-use flows
 """
 
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Any, Optional, ClassVar, Mapping, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Costs are accumulated as integer nano-dollars so long sessions don't drift from float rounding
+NANO_USD_PER_USD = 1_000_000_000
+
+@dataclass(slots=True)
 class TokenUsage:
     """Track token usage for a single LLM call"""
     input_tokens: int = 0
     output_tokens: int = 0
     total_tokens: int = 0
     cost: float = 0.0
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: int = field(default_factory=time.time_ns)  # Wall-clock nanoseconds since the epoch
+
+    @property
+    def wall_time(self) -> datetime:
+        """Timestamp of the call as a datetime"""
+        return datetime.fromtimestamp(self.timestamp / 1_000_000_000)
 
-@dataclass
+@dataclass(slots=True)
 class ModelUsage:
     """Track cumulative usage for a specific model"""
     model_name: str = ""
     total_input_tokens: int = 0
     total_output_tokens: int = 0
     total_tokens: int = 0
-    total_cost: float = 0.0
+    total_cost_nano: int = 0
     call_count: int = 0
 
+    @property
+    def total_cost(self) -> float:
+        """Cumulative cost in USD"""
+        return self.total_cost_nano / NANO_USD_PER_USD
+
 class TokenTracker:
     """Simple token tracking implementation for the hybrid testing framework"""
     
+    # Token costs per 1K tokens (approximate AWS Bedrock pricing), shared by all instances
+    TOKEN_COSTS: ClassVar[Mapping[str, Mapping[str, float]]] = MappingProxyType({
+        "anthropic.claude-3-5-sonnet-20241022-v2:0": MappingProxyType({
+            "input": 0.003,   # $3 per 1M input tokens
+            "output": 0.015   # $15 per 1M output tokens
+        }),
+        "anthropic.claude-3-haiku-20240307-v1:0": MappingProxyType({
+            "input": 0.00025, # $0.25 per 1M input tokens
+            "output": 0.00125 # $1.25 per 1M output tokens
+        }),
+        "gpt-4": MappingProxyType({
+            "input": 0.03,    # $30 per 1M input tokens
+            "output": 0.06    # $60 per 1M output tokens
+        }),
+        "gpt-3.5-turbo": MappingProxyType({
+            "input": 0.0015,  # $1.50 per 1M input tokens
+            "output": 0.002   # $2 per 1M output tokens
+        })
+    })
+    
+    # Per-token rates in nano-dollars, derived once from TOKEN_COSTS ($ per 1K tokens)
+    _RATE_PER_TOKEN_NANO: ClassVar[Mapping[str, Tuple[int, int]]] = MappingProxyType({
+        model_name: (round(rates["input"] * 1_000_000), round(rates["output"] * 1_000_000))
+        for model_name, rates in TOKEN_COSTS.items()
+    })
+    # Default rates if model not found: $3 / $15 per 1M tokens
+    _DEFAULT_RATE_PER_TOKEN_NANO: ClassVar[Tuple[int, int]] = (3_000, 15_000)
+    
     def __init__(self):
         self.model_usage: Dict[str, ModelUsage] = {}
         self.session_start = datetime.now()
-        
-        # Token costs per 1K tokens (approximate AWS Bedrock pricing)
-        self.token_costs = {
-            "anthropic.claude-3-5-sonnet-20241022-v2:0": {
-                "input": 0.003,   # $3 per 1M input tokens
-                "output": 0.015   # $15 per 1M output tokens
-            },
-            "anthropic.claude-3-haiku-20240307-v1:0": {
-                "input": 0.00025, # $0.25 per 1M input tokens
-                "output": 0.00125 # $1.25 per 1M output tokens
-            },
-            "gpt-4": {
-                "input": 0.03,    # $30 per 1M input tokens
-                "output": 0.06    # $60 per 1M output tokens
-            },
-            "gpt-3.5-turbo": {
-                "input": 0.0015,  # $1.50 per 1M input tokens
-                "output": 0.002   # $2 per 1M output tokens
-            }
-        }
     
     def track_llm_call(self, model_name: str, input_tokens: int, output_tokens: int) -> TokenUsage:
         """Track a single LLM call"""
-        total_tokens = input_tokens + output_tokens
-        
-        # Calculate cost
-        cost = self._calculate_cost(model_name, input_tokens, output_tokens)
+        cost_nano = self._record_call(model_name, input_tokens, output_tokens)
         
         # Create usage record
-        usage = TokenUsage(
+        return TokenUsage(
             input_tokens=input_tokens,
             output_tokens=output_tokens,
-            total_tokens=total_tokens,
-            cost=cost
+            total_tokens=input_tokens + output_tokens,
+            cost=cost_nano / NANO_USD_PER_USD
         )
+    
+    def track_llm_call_inplace(self, model_name: str, input_tokens: int, output_tokens: int) -> None:
+        """Track a single LLM call without building a per-call TokenUsage record"""
+        self._record_call(model_name, input_tokens, output_tokens)
+    
+    def _record_call(self, model_name: str, input_tokens: int, output_tokens: int) -> int:
+        """Update the per-model aggregates for a call and return its cost in nano-dollars"""
+        total_tokens = input_tokens + output_tokens
+        
+        # Calculate cost
+        cost_nano = self._calculate_cost_nano(model_name, input_tokens, output_tokens)
         
         # Update model usage
         if model_name not in self.model_usage:
@@ -79,26 +111,27 @@ class TokenTracker:
         model.total_input_tokens += input_tokens
         model.total_output_tokens += output_tokens
         model.total_tokens += total_tokens
-        model.total_cost += cost
+        model.total_cost_nano += cost_nano
         model.call_count += 1
         
-        logger.debug(f"Tracked LLM call: {model_name} - {total_tokens} tokens, ${cost:.4f}")
+        logger.debug(f"Tracked LLM call: {model_name} - {total_tokens} tokens, ${cost_nano / NANO_USD_PER_USD:.4f}")
         
-        return usage
+        return cost_nano
     
     def _calculate_cost(self, model_name: str, input_tokens: int, output_tokens: int) -> float:
         """Calculate cost for token usage"""
-        if model_name not in self.token_costs:
+        return self._calculate_cost_nano(model_name, input_tokens, output_tokens) / NANO_USD_PER_USD
+    
+    def _calculate_cost_nano(self, model_name: str, input_tokens: int, output_tokens: int) -> int:
+        """Calculate cost for token usage in integer nano-dollars"""
+        rates = self._RATE_PER_TOKEN_NANO.get(model_name)
+        if rates is None:
             # Default pricing if model not found
             logger.warning(f"Unknown model for pricing: {model_name}, using default rates")
-            input_cost = input_tokens * 0.003 / 1000  # $3 per 1M tokens
-            output_cost = output_tokens * 0.015 / 1000  # $15 per 1M tokens
-        else:
-            rates = self.token_costs[model_name]
-            input_cost = input_tokens * rates["input"] / 1000
-            output_cost = output_tokens * rates["output"] / 1000
+            rates = self._DEFAULT_RATE_PER_TOKEN_NANO
         
-        return input_cost + output_cost
+        input_rate, output_rate = rates
+        return int(input_tokens) * input_rate + int(output_tokens) * output_rate
     
     def get_usage_summary(self) -> Dict[str, Any]:
         """Get comprehensive usage summary"""
@@ -126,7 +159,7 @@ class TokenTracker:
     
     def get_total_cost(self) -> float:
         """Get total cost across all models"""
-        return sum(usage.total_cost for usage in self.model_usage.values())
+        return sum(usage.total_cost_nano for usage in self.model_usage.values()) / NANO_USD_PER_USD
     
     def get_total_tokens(self) -> int:
         """Get total tokens across all models"""
@@ -138,17 +171,33 @@ class TokenTracker:
         self.session_start = datetime.now()
         logger.info("Token tracking reset")
 
-# Global token tracker instance
-_global_tracker = TokenTracker()
+# Global token tracker instance, created on first use
+_global_tracker: Optional[TokenTracker] = None
+_global_tracker_lock = threading.Lock()
 
 def get_token_tracker() -> TokenTracker:
-    """Get the global token tracker instance"""
+    """Get the global token tracker instance, creating it on first use"""
+    global _global_tracker
+    if _global_tracker is None:
+        # Concurrent first callers must share one tracker, or usage recorded on the others is lost
+        with _global_tracker_lock:
+            if _global_tracker is None:
+                _global_tracker = TokenTracker()
     return _global_tracker
 
-def track_llm_call(model_name: str, input_tokens: int, output_tokens: int) -> TokenUsage:
-    """Convenience function to track an LLM call"""
-    return _global_tracker.track_llm_call(model_name, input_tokens, output_tokens)
+def track_llm_call(
+    model_name: str,
+    input_tokens: int,
+    output_tokens: int,
+    return_usage: bool = True
+) -> Optional[TokenUsage]:
+    """Convenience function to track an LLM call; pass return_usage=False to skip the per-call record"""
+    tracker = get_token_tracker()
+    if not return_usage:
+        tracker.track_llm_call_inplace(model_name, input_tokens, output_tokens)
+        return None
+    return tracker.track_llm_call(model_name, input_tokens, output_tokens)
 
 def get_usage_summary() -> Dict[str, Any]:
     """Convenience function to get usage summary"""
-    return _global_tracker.get_usage_summary()
+    return get_token_tracker().get_usage_summary()
@@ -2,12 +2,16 @@
 Workflow capture system for converting browser-use agent actions to workflow.json
 """
 
-import json
+import asyncio
 import logging
+import sys
+import textwrap
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional
 from datetime import datetime
 
+import aiofiles
 from browser_use.agent.views import AgentHistoryList, AgentHistory
 from workflow_use.schema.views import (
     WorkflowDefinitionSchema,
@@ -23,6 +27,16 @@ from workflow_use.schema.views import (
 
 logger = logging.getLogger(__name__)
 
+# Model output keys that map to workflow steps; everything else (interacted_element, done, wait, ...) is skipped
+_ACTION_NAMES: FrozenSet[str] = frozenset(sys.intern(name) for name in (
+    "go_to_url",
+    "click_element_by_index",
+    "input_text",
+    "key_press",
+    "scroll",
+    "select_option",
+))
+
 
 class WorkflowCapture:
     """Captures browser-use agent actions and converts them to workflow.json format"""
@@ -54,25 +68,27 @@ class WorkflowCapture:
 
             # Handle AgentHistoryList
             if hasattr(agent_history, 'all_model_outputs'):
-                # Process all model outputs from the agent history
-                for model_output in agent_history.all_model_outputs:
-                    step = self._convert_model_output_to_step(model_output)
-                    if step:
-                        self.captured_steps.append(step)
+                # Process all model outputs from the agent history in a single list build
+                self.captured_steps = [
+                    step for step in (
+                        self._convert_model_output_to_step(model_output)
+                        for model_output in agent_history.all_model_outputs
+                    ) if step
+                ]
             elif isinstance(agent_history, list):
                 # Handle as list of history items
-                for history_item in agent_history:
-                    workflow_steps = self._convert_history_item_to_steps(history_item)
-                    self.captured_steps.extend(workflow_steps)
+                self.captured_steps = list(chain.from_iterable(
+                    self._convert_history_item_to_steps(history_item)
+                    for history_item in agent_history
+                ))
             else:
                 # Try to process as single item
-                workflow_steps = self._convert_history_item_to_steps(agent_history)
-                self.captured_steps.extend(workflow_steps)
+                self.captured_steps = self._convert_history_item_to_steps(agent_history)
 
             # If no steps were captured, create a basic navigation step
             if not self.captured_steps:
                 logger.warning("No workflow steps captured, creating basic navigation step")
-                # Try to extract URL from agent history content
+                # Try to extract URL from agent history content; only walked when nothing was captured
                 url = self._extract_url_from_agent_history(agent_history)
                 if url:
                     self.captured_steps.append(
@@ -152,67 +168,87 @@ class WorkflowCapture:
     def _convert_model_output_to_step(self, model_output: Dict[str, Any]) -> Optional[WorkflowStep]:
         """Convert a model output dictionary to a workflow step"""
         try:
-            # Extract the action from model output
-            for action_name, action_data in model_output.items():
-                if action_name == 'interacted_element':
-                    continue  # Skip metadata
-
-                if action_name == 'go_to_url':
-                    return NavigationStep(
-                        action="navigate",
-                        url=action_data.get('url', ''),
-                        wait_for_load=True
-                    )
-                elif action_name == 'click_element_by_index':
-                    # Try to get selector from interacted_element
-                    element = model_output.get('interacted_element')
-                    selector = self._extract_selector_from_element(element)
-                    if selector:
-                        return ClickStep(
-                            action="click",
-                            selector=selector,
-                            wait_for_element=True
-                        )
-                elif action_name == 'input_text':
-                    element = model_output.get('interacted_element')
-                    selector = self._extract_selector_from_element(element)
-                    text = action_data.get('text', '')
-                    if selector and text:
-                        return InputStep(
-                            action="input",
-                            selector=selector,
-                            text=text,
-                            clear_first=True
-                        )
-                elif action_name == 'key_press':
-                    key = action_data.get('key', '')
-                    if key:
-                        return KeyPressStep(
-                            action="key_press",
-                            key=key
-                        )
-                elif action_name == 'scroll':
-                    return ScrollStep(
-                        action="scroll",
-                        direction=action_data.get('direction', 'down'),
-                        amount=action_data.get('amount', 500)
-                    )
-                elif action_name == 'select_option':
-                    element = model_output.get('interacted_element')
-                    selector = self._extract_selector_from_element(element)
-                    value = action_data.get('value', '')
-                    if selector and value:
-                        return SelectChangeStep(
-                            action="select_change",
-                            selector=selector,
-                            value=value
-                        )
-                # Skip 'done', 'wait', 'extract_content' as they're not workflow actions
+            # Look up the known actions directly instead of walking every key of the model output
+            action_names = _ACTION_NAMES & model_output.keys()
+            if not action_names:
+                return None
+            if len(action_names) > 1:
+                # Keep the model's own action order when several actions are present
+                action_names = [name for name in model_output if name in action_names]
+
+            element = model_output.get('interacted_element')
+            for action_name in action_names:
+                step = _ACTION_DISPATCH[action_name](self, model_output[action_name], element)
+                if step:
+                    return step
 
         except Exception as e:
             logger.warning(f"Error converting model output to step: {e}")
 
         return None
+
+    def _navigation_step_from_output(self, action_data: Dict[str, Any], element) -> Optional[NavigationStep]:
+        """Create navigation step from a go_to_url model output"""
+        return NavigationStep(
+            action="navigate",
+            url=action_data.get('url', ''),
+            wait_for_load=True
+        )
+
+    def _click_step_from_output(self, action_data: Dict[str, Any], element) -> Optional[ClickStep]:
+        """Create click step from a click_element_by_index model output"""
+        # Try to get selector from interacted_element
+        selector = self._extract_selector_from_element(element)
+        if selector:
+            return ClickStep(
+                action="click",
+                selector=selector,
+                wait_for_element=True
+            )
+        return None
+
+    def _input_step_from_output(self, action_data: Dict[str, Any], element) -> Optional[InputStep]:
+        """Create input step from an input_text model output"""
+        selector = self._extract_selector_from_element(element)
+        text = action_data.get('text', '')
+        if selector and text:
+            return InputStep(
+                action="input",
+                selector=selector,
+                text=text,
+                clear_first=True
+            )
+        return None
+
+    def _key_press_step_from_output(self, action_data: Dict[str, Any], element) -> Optional[KeyPressStep]:
+        """Create key press step from a key_press model output"""
+        key = action_data.get('key', '')
+        if key:
+            return KeyPressStep(
+                action="key_press",
+                key=key
+            )
+        return None
+
+    def _scroll_step_from_output(self, action_data: Dict[str, Any], element) -> Optional[ScrollStep]:
+        """Create scroll step from a scroll model output"""
+        return ScrollStep(
+            action="scroll",
+            direction=action_data.get('direction', 'down'),
+            amount=action_data.get('amount', 500)
+        )
+
+    def _select_step_from_output(self, action_data: Dict[str, Any], element) -> Optional[SelectChangeStep]:
+        """Create select step from a select_option model output"""
+        selector = self._extract_selector_from_element(element)
+        value = action_data.get('value', '')
+        if selector and value:
+            return SelectChangeStep(
+                action="select_change",
+                selector=selector,
+                value=value
+            )
+        return None
     
     def _create_navigation_step(self, action) -> Optional[NavigationStep]:
         """Create navigation step from action"""
@@ -395,10 +431,54 @@ class WorkflowCapture:
             output_file.parent.mkdir(parents=True, exist_ok=True)
             
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(workflow_def.model_dump(), f, indent=2, ensure_ascii=False)
+                f.writelines(_iter_workflow_json(workflow_def))
             
             logger.info(f"Workflow saved to: {output_file}")
             
         except Exception as e:
             logger.error(f"Error saving workflow to {output_path}: {e}")
             raise
+
+    async def save_many(self, workflow_defs: List[WorkflowDefinitionSchema], output_paths: List[str]) -> None:
+        """Save several workflow definitions concurrently"""
+        if len(workflow_defs) != len(output_paths):
+            raise ValueError("workflow_defs and output_paths must have the same length")
+
+        async def _write(workflow_def: WorkflowDefinitionSchema, output_path: str) -> None:
+            output_file = Path(output_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(output_file, 'w', encoding='utf-8') as f:
+                await f.writelines(_iter_workflow_json(workflow_def))
+            logger.info(f"Workflow saved to: {output_file}")
+
+        try:
+            await asyncio.gather(*(_write(d, p) for d, p in zip(workflow_defs, output_paths)))
+        except Exception as e:
+            logger.error(f"Error saving workflows: {e}")
+            raise
+
+
+def _iter_workflow_json(workflow_def: WorkflowDefinitionSchema) -> Iterator[str]:
+    """
+    Yield the indented JSON for a workflow definition one step at a time
+
+    Only a single step is serialized at once, so saving a large workflow never holds
+    the whole document in memory. The steps list is written last.
+    """
+    header = workflow_def.model_dump_json(indent=2, exclude={'steps'})
+    # Reopen the top-level object (drop the closing "\n}") and append the steps list
+    yield ('{\n' if header == '{}' else header[:-2] + ',\n') + '  "steps": ['
+    for index, step in enumerate(workflow_def.steps):
+        yield (',\n' if index else '\n') + textwrap.indent(step.model_dump_json(indent=2), '    ')
+    yield '\n  ]\n}' if workflow_def.steps else ']\n}'
+
+
+# Model output action name -> WorkflowCapture step builder
+_ACTION_DISPATCH: Dict[str, Callable[[WorkflowCapture, Dict[str, Any], Any], Optional[WorkflowStep]]] = {
+    "go_to_url": WorkflowCapture._navigation_step_from_output,
+    "click_element_by_index": WorkflowCapture._click_step_from_output,
+    "input_text": WorkflowCapture._input_step_from_output,
+    "key_press": WorkflowCapture._key_press_step_from_output,
+    "scroll": WorkflowCapture._scroll_step_from_output,
+    "select_option": WorkflowCapture._select_step_from_output,
+}
@@ -5,9 +5,15 @@ This module provides a factory for creating different LLM providers
 with proper configuration and error handling.
 """
 
+import concurrent.futures
+import dataclasses
+import functools
+import hashlib
 import os
 import logging
-from typing import Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.language_models.chat_models import BaseChatModel
 
@@ -15,12 +21,85 @@ from workflow_use.config.llm_config import LLMConfig
 
 logger = logging.getLogger(__name__)
 
+# Validated boto3 sessions keyed by (aws_profile, aws_region), with the time they were checked
+_SESSION_TTL_SECONDS = 300
+_VALIDATED_SESSIONS: Dict[Tuple[Optional[str], str], Tuple[Any, float]] = {}
+
+# Retry/fallback policy for create_llm_with_fallback
+_MAX_CREATE_ATTEMPTS = 3
+_MAX_BACKOFF_SECONDS = 10
+
+# Network, timeout and throttling exceptions worth retrying, matched by class name anywhere in the MRO
+# so the optional SDKs (botocore, httpx, openai, anthropic) don't have to be imported
+_TRANSIENT_ERROR_NAMES = frozenset({
+    'ConnectionError', 'TimeoutError', 'ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError',
+    'TransportError', 'TimeoutException', 'APIConnectionError', 'APITimeoutError', 'RateLimitError',
+})
+_TRANSIENT_AWS_ERROR_CODES = frozenset({'Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'ServiceUnavailable'})
+
+# Circuit breaker keyed by _breaker_key(config): {"failure_count": int, "open_until": time.monotonic()}.
+# A configuration with failures is degraded (still tried, but last); after _BREAKER_OPEN_AFTER consecutive
+# failures it is open and rejected outright, for a cooldown that grows 60s, 300s, 1500s up to an hour.
+_BREAKER_OPEN_AFTER = _MAX_CREATE_ATTEMPTS
+_BREAKER_BASE_COOLDOWN_SECONDS = 60
+_BREAKER_MAX_COOLDOWN_SECONDS = 3600
+_BREAKER: Dict[str, Dict[str, float]] = {}
+_BREAKER_LOCK = threading.Lock()
+
 
 class LLMProviderError(Exception):
-    """Exception raised when LLM provider initialization fails."""
+    """Exception raised when LLM provider initialization fails.
+    
+    transient is True for network, timeout and throttling failures, the only ones worth retrying.
+    """
+    
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class ProviderCircuitOpenError(LLMProviderError):
+    """Raised without contacting the provider while its circuit breaker is open."""
     pass
 
 
+# Provider SDKs are imported on first use and cached, so repeated LLM creation skips the import machinery
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_openai():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI
+
+
+@functools.lru_cache(maxsize=None)
+def _get_bedrock_sdk():
+    from langchain_aws import ChatBedrock
+    import boto3
+    from botocore.config import Config
+    return ChatBedrock, boto3, Config
+
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_anthropic():
+    from langchain_anthropic import ChatAnthropic
+    return ChatAnthropic
+
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_google():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI
+
+
+def _get_typer():
+    """Import typer for the interactive setup helpers; it is an optional dependency."""
+    try:
+        import typer
+    except ImportError:
+        raise LLMProviderError("typer is required for interactive mode. Install with: pip install 'workflow-use[cli]'")
+    return typer
+
+
 def create_llm_from_config(config: LLMConfig) -> BaseChatModel:
     """
     Create an LLM instance from configuration.
@@ -39,25 +118,92 @@ def create_llm_from_config(config: LLMConfig) -> BaseChatModel:
     except ValueError as e:
         raise LLMProviderError(f"Configuration validation failed: {e}")
     
+    _check_breaker(config)
+    
     try:
         if config.provider == 'openai':
-            return _create_openai_llm(config)
+            llm = _create_openai_llm(config)
         elif config.provider == 'bedrock':
-            return _create_bedrock_llm(config)
+            llm = _create_bedrock_llm(config)
         elif config.provider == 'anthropic':
-            return _create_anthropic_llm(config)
+            llm = _create_anthropic_llm(config)
         elif config.provider == 'google':
-            return _create_google_llm(config)
+            llm = _create_google_llm(config)
         else:
             raise LLMProviderError(f"Unsupported provider: {config.provider}")
     except Exception as e:
-        raise LLMProviderError(f"Failed to initialize {config.provider} provider: {e}")
+        _record_failure(config)
+        transient = e.transient if isinstance(e, LLMProviderError) else _is_transient(e)
+        raise LLMProviderError(f"Failed to initialize {config.provider} provider: {e}", transient=transient)
+    
+    _reset_breaker(config)
+    return llm
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Whether an exception from a provider SDK is a network, timeout or throttling failure."""
+    if any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    # botocore ClientError carries the service error code in its response
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code') in _TRANSIENT_AWS_ERROR_CODES
+    return False
+
+
+def _breaker_key(config: LLMConfig) -> str:
+    """Identify a configuration for the circuit breaker by provider, model and credentials.
+    
+    Keying on the credentials lets a corrected API key or AWS profile through right after the old one failed.
+    """
+    if config.provider == 'bedrock':
+        return f"bedrock:{config.bedrock_model_id or config.model}:{config.aws_profile}@{config.aws_region}"
+    api_key = {
+        'openai': config.openai_api_key,
+        'anthropic': config.anthropic_api_key,
+        'google': config.google_api_key,
+    }.get(config.provider) or ''
+    # Hash the key so the secret isn't kept in the breaker state
+    key_digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return f"{config.provider}:{config.model}:{key_digest}"
+
+
+def _check_breaker(config: LLMConfig) -> None:
+    """Raise ProviderCircuitOpenError if the configuration's breaker is open."""
+    with _BREAKER_LOCK:
+        state = _BREAKER.get(_breaker_key(config))
+        if state is None:
+            return
+        remaining = state["open_until"] - time.monotonic()
+    if remaining > 0:
+        raise ProviderCircuitOpenError(
+            f"{config.provider} provider is cooling down after {int(state['failure_count'])} consecutive failures, "
+            f"retry in {remaining:.0f}s"
+        )
+
+
+def _record_failure(config: LLMConfig) -> None:
+    """Count a failed initialization, opening the breaker once failures pile up."""
+    with _BREAKER_LOCK:
+        state = _BREAKER.setdefault(_breaker_key(config), {"failure_count": 0, "open_until": 0.0})
+        state["failure_count"] += 1
+        trips = state["failure_count"] - _BREAKER_OPEN_AFTER
+        if trips >= 0:
+            cooldown = min(_BREAKER_BASE_COOLDOWN_SECONDS * 5 ** trips, _BREAKER_MAX_COOLDOWN_SECONDS)
+            state["open_until"] = time.monotonic() + cooldown
+            logger.warning(f"Circuit breaker open for {config.provider} provider ({config.model}) for {cooldown}s")
+
+
+def _reset_breaker(config: LLMConfig) -> None:
+    """Close the configuration's breaker."""
+    with _BREAKER_LOCK:
+        _BREAKER.pop(_breaker_key(config), None)
 
 
 def _create_openai_llm(config: LLMConfig) -> BaseChatModel:
     """Create OpenAI LLM instance."""
     try:
-        from langchain_openai import ChatOpenAI
+        ChatOpenAI = _get_chat_openai()
     except ImportError:
         raise LLMProviderError("langchain-openai is required for OpenAI provider. Install with: pip install langchain-openai")
     
@@ -69,29 +215,48 @@ def _create_openai_llm(config: LLMConfig) -> BaseChatModel:
 def _create_bedrock_llm(config: LLMConfig) -> BaseChatModel:
     """Create AWS Bedrock LLM instance."""
     try:
-        from langchain_aws import ChatBedrock
-        import boto3
+        ChatBedrock, boto3, Config = _get_bedrock_sdk()
     except ImportError:
         raise LLMProviderError("langchain-aws and boto3 are required for Bedrock provider. Install with: pip install langchain-aws boto3")
     
+    session = _get_validated_session(boto3, config.aws_profile, config.aws_region)
+    
+    kwargs = config.get_bedrock_kwargs()
+    kwargs['client'] = session.client(
+        'bedrock-runtime',
+        config=Config(read_timeout=config.timeout, retries={'max_attempts': config.max_retries})
+    )
+    logger.info(f"Initializing Bedrock LLM with model: {kwargs['model_id']} using profile: {config.aws_profile}")
+    return ChatBedrock(**kwargs)
+
+
+def _get_validated_session(boto3, aws_profile: Optional[str], aws_region: str):
+    """Return a boto3 Session whose credentials were verified within the last _SESSION_TTL_SECONDS."""
+    key = (aws_profile, aws_region)
+    cached = _VALIDATED_SESSIONS.get(key)
+    if cached is not None and time.monotonic() - cached[1] < _SESSION_TTL_SECONDS:
+        return cached[0]
+    
     # Verify AWS profile exists
     try:
-        session = boto3.Session(profile_name=config.aws_profile, region_name=config.aws_region)
+        session = boto3.Session(profile_name=aws_profile, region_name=aws_region)
         # Test credentials by getting caller identity
         sts = session.client('sts')
         sts.get_caller_identity()
     except Exception as e:
-        raise LLMProviderError(f"AWS profile '{config.aws_profile}' is not configured or accessible: {e}")
+        _VALIDATED_SESSIONS.pop(key, None)
+        raise LLMProviderError(
+            f"AWS profile '{aws_profile}' is not configured or accessible: {e}", transient=_is_transient(e)
+        )
     
-    kwargs = config.get_bedrock_kwargs()
-    logger.info(f"Initializing Bedrock LLM with model: {kwargs['model_id']} using profile: {config.aws_profile}")
-    return ChatBedrock(**kwargs)
+    _VALIDATED_SESSIONS[key] = (session, time.monotonic())
+    return session
 
 
 def _create_anthropic_llm(config: LLMConfig) -> BaseChatModel:
     """Create Anthropic LLM instance."""
     try:
-        from langchain_anthropic import ChatAnthropic
+        ChatAnthropic = _get_chat_anthropic()
     except ImportError:
         raise LLMProviderError("langchain-anthropic is required for Anthropic provider. Install with: pip install langchain-anthropic")
     
@@ -103,7 +268,7 @@ def _create_anthropic_llm(config: LLMConfig) -> BaseChatModel:
 def _create_google_llm(config: LLMConfig) -> BaseChatModel:
     """Create Google LLM instance."""
     try:
-        from langchain_google_genai import ChatGoogleGenerativeAI
+        ChatGoogleGenerativeAI = _get_chat_google()
     except ImportError:
         raise LLMProviderError("langchain-google-genai is required for Google provider. Install with: pip install langchain-google-genai")
     
@@ -114,14 +279,20 @@ def _create_google_llm(config: LLMConfig) -> BaseChatModel:
 
 def create_llm_with_fallback(
     primary_config: Optional[LLMConfig] = None,
-    interactive: bool = False
+    interactive: bool = False,
+    fallback_configs: Optional[List[LLMConfig]] = None
 ) -> Tuple[Optional[BaseChatModel], Optional[BaseChatModel]]:
     """
     Create LLM instances with fallback and interactive configuration.
     
+    Transient failures of each configuration are retried with exponential backoff before
+    moving on to the next one.
+    Configurations that failed recently are tried after the others.
+    
     Args:
         primary_config: Primary LLM configuration. If None, loads from environment.
         interactive: Whether to prompt user for missing configuration
+        fallback_configs: Configurations to try, in order, if the primary one fails
         
     Returns:
         Tuple of (main_llm, page_extraction_llm)
@@ -130,42 +301,78 @@ def create_llm_with_fallback(
         from workflow_use.config.llm_config import get_default_config
         primary_config = get_default_config()
     
-    main_llm = None
-    page_extraction_llm = None
+    candidates = [primary_config, *(fallback_configs or [])]
+    # Stable sort: configurations whose circuit breaker has recorded failures go last
+    candidates.sort(key=_in_cooldown)
     
-    try:
-        # Try to create main LLM
-        main_llm = create_llm_from_config(primary_config)
-        logger.info(f"Successfully initialized {primary_config.provider} LLM")
-        
-        # Create page extraction LLM (use smaller model if available)
-        page_config = primary_config
-        if primary_config.provider == 'openai':
-            page_config = LLMConfig(
-                provider=primary_config.provider,
-                model='gpt-4o-mini',
-                temperature=primary_config.temperature,
-                openai_api_key=primary_config.openai_api_key
-            )
-        
-        page_extraction_llm = create_llm_from_config(page_config)
-        
-    except LLMProviderError as e:
-        logger.error(f"LLM initialization failed: {e}")
+    last_error: Optional[LLMProviderError] = None
+    for config in candidates:
+        try:
+            main_llm, page_extraction_llm = _create_llm_pair(config)
+            logger.info(f"Successfully initialized {config.provider} LLM")
+            return main_llm, page_extraction_llm
+        except LLMProviderError as e:
+            logger.error(f"LLM initialization failed for {config.provider}: {e}")
+            last_error = e
+    
+    if interactive:
+        return _interactive_llm_setup(str(last_error))
+    
+    # In non-interactive mode, just log the error and return None
+    logger.warning(f"LLM initialization failed in non-interactive mode: {last_error}")
+    return None, None
 
-        if interactive:
-            main_llm, page_extraction_llm = _interactive_llm_setup(str(e))
-        else:
-            # In non-interactive mode, just log the error and return None
-            logger.warning(f"LLM initialization failed in non-interactive mode: {e}")
-            return None, None
+
+def _in_cooldown(config: LLMConfig) -> bool:
+    """Whether the config is degraded or open in the circuit breaker."""
+    with _BREAKER_LOCK:
+        return _breaker_key(config) in _BREAKER
+
+
+def _create_llm_pair(primary_config: LLMConfig) -> Tuple[BaseChatModel, BaseChatModel]:
+    """Create the main and page extraction LLMs for a single configuration."""
+    # Create page extraction LLM (use smaller model if available)
+    page_config = primary_config
+    if primary_config.provider == 'openai':
+        # Copy the primary config so its timeout, retry and token limits apply to the page model too
+        page_config = dataclasses.replace(primary_config, model='gpt-4o-mini')
+    
+    if page_config is primary_config or page_config == primary_config:
+        # Same model, so share the client instead of building a second one
+        main_llm = _create_llm_with_retry(primary_config)
+        return main_llm, main_llm
     
-    return main_llm, page_extraction_llm
+    # Build both clients concurrently; each may validate credentials over the network
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        main_future = executor.submit(_create_llm_with_retry, primary_config)
+        page_future = executor.submit(_create_llm_with_retry, page_config)
+        return main_future.result(), page_future.result()
+
+
+def _create_llm_with_retry(config: LLMConfig) -> BaseChatModel:
+    """Create an LLM, retrying transient failures with exponential backoff."""
+    # Configuration, import and credential errors won't fix themselves, so only transient ones are retried
+    try:
+        config.validate()
+    except ValueError as e:
+        raise LLMProviderError(f"Configuration validation failed: {e}")
+    
+    for attempt in range(1, _MAX_CREATE_ATTEMPTS + 1):
+        try:
+            return create_llm_from_config(config)
+        except LLMProviderError as e:
+            if not e.transient or attempt == _MAX_CREATE_ATTEMPTS:
+                raise
+            # A half-open breaker that just re-opened won't let the next attempt through, so don't wait for it
+            _check_breaker(config)
+            delay = min(2 ** (attempt - 1), _MAX_BACKOFF_SECONDS)
+            logger.warning(f"{config.provider} LLM creation failed (attempt {attempt}/{_MAX_CREATE_ATTEMPTS}), retrying in {delay}s: {e}")
+            time.sleep(delay)
 
 
 def _interactive_llm_setup(error_msg: str) -> Tuple[Optional[BaseChatModel], Optional[BaseChatModel]]:
-    """Interactive LLM setup when automatic initialization fails."""
-    import typer
+    """Interactive LLM setup when automatic initialization fails. Only reached with interactive=True."""
+    typer = _get_typer()
     
     typer.secho(f'Error initializing LLM: {error_msg}', fg=typer.colors.RED)
     
@@ -188,25 +395,25 @@ def _interactive_llm_setup(error_msg: str) -> Tuple[Optional[BaseChatModel], Opt
 
 def _setup_openai_interactive() -> Tuple[Optional[BaseChatModel], Optional[BaseChatModel]]:
     """Interactive OpenAI setup."""
-    import typer
+    typer = _get_typer()
     
     api_key = typer.prompt("Enter your OpenAI API key", hide_input=True)
     os.environ['OPENAI_API_KEY'] = api_key
     
-    config = LLMConfig(
+    # Start from the environment so LLM_TIMEOUT, LLM_MAX_RETRIES and LLM_MAX_TOKENS still apply
+    config = dataclasses.replace(
+        LLMConfig.from_env(),
         provider='openai',
         model='gpt-4o',
         openai_api_key=api_key
     )
+    page_config = dataclasses.replace(config, model='gpt-4o-mini')
+    # The user just entered these credentials, so don't hold earlier failures against them
+    _reset_breaker(config)
+    _reset_breaker(page_config)
     
     try:
         main_llm = create_llm_from_config(config)
-        
-        page_config = LLMConfig(
-            provider='openai',
-            model='gpt-4o-mini',
-            openai_api_key=api_key
-        )
         page_extraction_llm = create_llm_from_config(page_config)
         
         typer.secho("OpenAI LLM initialized successfully!", fg=typer.colors.GREEN)
@@ -218,7 +425,7 @@ def _setup_openai_interactive() -> Tuple[Optional[BaseChatModel], Optional[BaseC
 
 def _setup_bedrock_interactive() -> Tuple[Optional[BaseChatModel], Optional[BaseChatModel]]:
     """Interactive Bedrock setup."""
-    import typer
+    typer = _get_typer()
     
     aws_profile = typer.prompt("Enter your AWS profile name", default="default")
     model_id = typer.prompt(
@@ -226,12 +433,16 @@ def _setup_bedrock_interactive() -> Tuple[Optional[BaseChatModel], Optional[Base
         default="anthropic.claude-3-5-sonnet-20241022-v2:0"
     )
     
-    config = LLMConfig(
+    # Start from the environment so LLM_TIMEOUT, LLM_MAX_RETRIES and LLM_MAX_TOKENS still apply
+    config = dataclasses.replace(
+        LLMConfig.from_env(),
         provider='bedrock',
         aws_profile=aws_profile,
         bedrock_model_id=model_id,
         model=model_id
     )
+    # The user just entered these credentials, so don't hold earlier failures against them
+    _reset_breaker(config)
     
     try:
         main_llm = create_llm_from_config(config)
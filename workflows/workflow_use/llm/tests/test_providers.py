@@ -0,0 +1,39 @@
+import pytest
+
+from workflow_use.config.llm_config import LLMConfig
+from workflow_use.llm import providers
+from workflow_use.llm.providers import ProviderCircuitOpenError, create_llm_from_config, create_llm_with_fallback
+
+
+class FakeChatOpenAI:
+	"""Stands in for ChatOpenAI and rejects the 'bad-key' API key like an auth failure would."""
+
+	def __init__(self, **kwargs):
+		if kwargs['api_key'] == 'bad-key':
+			raise ValueError('Incorrect API key provided')
+		self.kwargs = kwargs
+
+
+@pytest.fixture(autouse=True)
+def fake_openai(monkeypatch):
+	monkeypatch.setattr(providers, '_get_chat_openai', lambda: FakeChatOpenAI)
+	monkeypatch.setattr(providers, '_BREAKER', {})
+
+
+def test_new_credentials_bypass_open_breaker():
+	"""
+	Tests that a corrected API key can create an LLM right after the old key tripped the breaker.
+	"""
+	bad_config = LLMConfig(provider='openai', model='gpt-4o', openai_api_key='bad-key')
+
+	for _ in range(providers._BREAKER_OPEN_AFTER):
+		assert create_llm_with_fallback(bad_config) == (None, None)
+
+	with pytest.raises(ProviderCircuitOpenError):
+		create_llm_from_config(bad_config)
+
+	good_config = LLMConfig(provider='openai', model='gpt-4o', openai_api_key='good-key')
+	llm = create_llm_from_config(good_config)
+
+	assert isinstance(llm, FakeChatOpenAI)
+	assert llm.kwargs['api_key'] == 'good-key'
@@ -3,26 +3,20 @@ Browser prompts for executing Gherkin scenarios with browser-use
 Copied from smart-test framework for compatibility
 """
 
+from string import Template
+from types import MappingProxyType
+from typing import Tuple
 
-def generate_browser_task(scenario: str, failure_behavior: str = "stop_on_assertion") -> str:
-    """Generate the browser task prompt for executing Gherkin scenarios with assertion-aware execution"""
-
-    failure_instructions = {
-        "stop_on_first": "Stop execution immediately on any step failure (action or assertion)",
-        "continue": "Continue execution even if steps fail, complete all steps",
-        "stop_on_assertion": "Continue on action failures but stop immediately on assertion failures"
-    }
+_FAILURE_INSTRUCTIONS = MappingProxyType({
+    "stop_on_first": "Stop execution immediately on any step failure (action or assertion)",
+    "continue": "Continue execution even if steps fail, complete all steps",
+    "stop_on_assertion": "Continue on action failures but stop immediately on assertion failures"
+})
 
-    failure_instruction = failure_instructions.get(failure_behavior, failure_instructions["stop_on_assertion"])
 
-    return f"""Execute this Gherkin scenario step-by-step with enhanced assertion validation:
-
-**Gherkin Steps:**
-```gherkin
-{scenario}
-```
-
-**Execution Rules:**
+# Static execution rules, identical for every scenario. Sent as part of the system message so
+# providers can serve it from their prompt cache instead of re-billing it per scenario.
+BROWSER_TASK_SYSTEM_PROMPT = """**Execution Rules:**
 1. **Given**: Set up initial state (navigate, verify elements exist)
 2. **When**: Perform actions (click, type, select)
 3. **Then**: Verify outcomes (check text, element presence, URL)
@@ -70,7 +64,7 @@ def generate_browser_task(scenario: str, failure_behavior: str = "stop_on_assert
 - For negative tests: Expected errors = TEST PASSED
 - Always use "Get detailed element information" on interactive elements
 - Final status must clearly state "PASSED" or "FAILED"
-- **Failure Behavior**: {failure_instruction}
+- Follow the Failure Behavior given with the scenario
 - Differentiate between action failures and assertion failures in reporting
 - Log all actions and results with enhanced assertion details
 - Report step-by-step progress as specified above
@@ -80,6 +74,35 @@ def generate_browser_task(scenario: str, failure_behavior: str = "stop_on_assert
 - For "Then" steps, focus on validation and provide detailed assertion results
 
 **Negative Test Handling:**
-If testing error conditions, seeing the expected error means TEST PASSED.
+If testing error conditions, seeing the expected error means TEST PASSED."""
+
+
+# Per-scenario task; compiled once at import so generation only substitutes the placeholders
+_BROWSER_TASK_TEMPLATE = Template("""Execute this Gherkin scenario step-by-step with enhanced assertion validation:
+
+**Gherkin Steps:**
+```gherkin
+${scenario}
+```
+
+**Failure Behavior**: ${failure_instruction}
+
+Execute each step methodically. Report step progress and final result clearly as PASSED or FAILED.""")
+
 
-Execute each step methodically. Report step progress and final result clearly as PASSED or FAILED."""
+def generate_browser_task_messages(scenario: str, failure_behavior: str = "stop_on_assertion") -> Tuple[str, str]:
+    """
+    Generate the browser task prompt split into a static system part and a per-scenario task
+
+    Returns:
+        (system_prompt, task): pass system_prompt as the agent's extend_system_message and task as its task
+    """
+    failure_instruction = _FAILURE_INSTRUCTIONS.get(failure_behavior, _FAILURE_INSTRUCTIONS["stop_on_assertion"])
+    task = _BROWSER_TASK_TEMPLATE.substitute(scenario=scenario, failure_instruction=failure_instruction)
+    return BROWSER_TASK_SYSTEM_PROMPT, task
+
+
+def generate_browser_task(scenario: str, failure_behavior: str = "stop_on_assertion") -> str:
+    """Generate the browser task prompt for executing Gherkin scenarios with assertion-aware execution"""
+    system_prompt, task = generate_browser_task_messages(scenario, failure_behavior)
+    return f"{task}\n\n{system_prompt}"
@@ -0,0 +1,191 @@
+"""
+Prompt/response caches for Gherkin conversion
+Unchanged test files are served from disk, and near-duplicates optionally from an
+embedding-similarity cache, instead of re-invoking the LLM
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Set GHERKIN_CACHE_PATH to an empty string to disable the cache
+DEFAULT_CACHE_PATH = ".gherkin_cache.db"
+
+# Values the Gherkin must preserve exactly: URLs, emails and quoted strings
+_LITERAL_RE = re.compile(
+    r"https?://[^\s\"'<>]+"
+    r"|[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+    r"|\"[^\"\n]*\""
+    r"|'[^'\n]*'"
+)
+
+# Semantic cache entries kept per model; lookups scan them linearly, so the oldest are dropped first
+SEMANTIC_CACHE_MAX_ENTRIES = 256
+
+# (literal values, normalized embedding) of a semantic cache query, returned by lookup() for add()
+SemanticQuery = Tuple[FrozenSet[str], List[float]]
+
+
+def prompt_cache_key(model_name: str, prompt: str) -> str:
+    """Build the exact-match cache key for a model/prompt pair"""
+    return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def extract_literals(text: str) -> FrozenSet[str]:
+    """Collect the URLs, emails and quoted strings in a test case"""
+    return frozenset(match.rstrip(".,;:!?)") for match in _LITERAL_RE.findall(text))
+
+
+class GherkinCache:
+    """SQLite-backed exact-match cache of Gherkin conversions"""
+
+    def __init__(self, database_path: Optional[str] = None):
+        if database_path is None:
+            database_path = os.getenv("GHERKIN_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.database_path = database_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.database_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.database_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS gherkin_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT response FROM gherkin_cache WHERE key = ?", (key,)
+                ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Gherkin cache lookup failed: {e}")
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response under key"""
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO gherkin_cache (key, response) VALUES (?, ?)", (key, response)
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Gherkin cache write failed: {e}")
+
+
+class SemanticGherkinCache:
+    """
+    In-memory cache that matches near-duplicate test cases by embedding similarity
+
+    Disabled unless GHERKIN_SEMANTIC_THRESHOLD is set (e.g. 0.95). Entries are partitioned by
+    model name and compared by cosine similarity of the manual test text, not of the full
+    prompt, whose shared instructions would make every test case look alike. Each model keeps
+    at most max_entries entries, oldest evicted first.
+
+    Test cases that differ only in a URL, email or password embed almost identically, so a hit
+    also requires the same literal values (see extract_literals); otherwise the cached Gherkin
+    would carry another test case's data.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES
+    ):
+        if threshold is None:
+            threshold_env = os.getenv("GHERKIN_SEMANTIC_THRESHOLD")
+            threshold = float(threshold_env) if threshold_env else None
+        self.threshold = threshold
+        self._embed = embed
+        self.max_entries = max_entries
+        self._entries: Dict[str, Deque[Tuple[FrozenSet[str], List[float], str]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None
+
+    def _get_embedder(self) -> Optional[Callable[[str], Sequence[float]]]:
+        if self._embed is None:
+            try:
+                from langchain_openai import OpenAIEmbeddings
+                self._embed = OpenAIEmbeddings(model="text-embedding-3-small").embed_query
+            except Exception as e:
+                logger.warning(f"Semantic Gherkin cache disabled, no embedding model available: {e}")
+                self.threshold = None
+        return self._embed
+
+    def _vectorize(self, text: str) -> Optional[List[float]]:
+        embed = self._get_embedder()
+        if embed is None:
+            return None
+        try:
+            vector = list(embed(text))
+        except Exception as e:
+            logger.warning(f"Embedding for semantic Gherkin cache failed: {e}")
+            return None
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else None
+
+    def lookup(self, model_name: str, text: str) -> Tuple[Optional[str], Optional[SemanticQuery]]:
+        """
+        Find the closest cached response for text with the same literal values
+
+        Returns:
+            (response or None, query to pass to add() on a miss)
+        """
+        if not self.enabled:
+            return None, None
+        vector = self._vectorize(text)
+        if vector is None:
+            return None, None
+        literals = extract_literals(text)
+
+        best_score, best_response = -1.0, None
+        with self._lock:
+            for cached_literals, cached_vector, response in self._entries.get(model_name, ()):
+                if cached_literals != literals:
+                    continue
+                score = sum(a * b for a, b in zip(vector, cached_vector))
+                if score > best_score:
+                    best_score, best_response = score, response
+
+        if best_response is not None and best_score >= self.threshold:
+            logger.debug(f"Semantic Gherkin cache hit (similarity {best_score:.3f})")
+            return best_response, (literals, vector)
+        return None, (literals, vector)
+
+    def add(self, model_name: str, query: Optional[SemanticQuery], response: str) -> None:
+        """Store a response under a query returned by lookup()"""
+        if not self.enabled or query is None:
+            return
+        literals, vector = query
+        with self._lock:
+            entries = self._entries.get(model_name)
+            if entries is None:
+                entries = self._entries[model_name] = deque(maxlen=self.max_entries)
+            entries.append((literals, vector, response))
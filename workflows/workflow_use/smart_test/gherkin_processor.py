@@ -3,17 +3,113 @@ Gherkin processing functions for converting text files to Gherkin scenarios
 Adapted from smart-test framework
 """
 
+import os
 import re
 import logging
-from typing import Optional
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage
 
+from workflow_use.smart_test.gherkin_cache import GherkinCache, SemanticGherkinCache, SemanticQuery, prompt_cache_key
+
 logger = logging.getLogger(__name__)
 
+# Manual test case files are a few KB; anything larger is almost certainly the wrong file
+MAX_TXT_BYTES = 1024 * 1024
+# Concurrent file reads and LLM requests in process_txt_batch
+BATCH_MAX_CONCURRENCY = 8
+
+# Content between triple backticks with optional language identifier
+_CODE_BLOCK_RE = re.compile(r"```(?:python|gherkin|javascript|java|robot|markdown)?\n(.*?)```", re.DOTALL)
+# Required Gherkin declarations
+_FEATURE_RE = re.compile(r"Feature:\s*\w+", re.IGNORECASE)
+_SCENARIO_RE = re.compile(r"Scenario:\s*\w+", re.IGNORECASE)
+# Any Gherkin step keyword, matched in a single scan
+_STEP_RE = re.compile(r"\b(?:Given|When|Then|And|But)\b")
+# Well-formed model output declares its feature, first scenario and first step within this many characters
+_FAST_PATH_WINDOW = 512
+
+# id(llm) -> (weakref to llm, resolved model name); langchain chat models are unhashable,
+# so a WeakKeyDictionary can't be used
+_MODEL_NAME_CACHE: Dict[int, Tuple[weakref.ref, str]] = {}
+
+# Persistent exact-match cache of LLM conversions, keyed on model name + prompt
+_GHERKIN_CACHE = GherkinCache()
+# Optional similarity-based cache consulted after an exact miss
+_SEMANTIC_CACHE = SemanticGherkinCache()
+
+# cache_key -> Future of the conversion currently running for it
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+# Static parts of the Gherkin conversion prompt; only the test case text between them changes per call
+_GHERKIN_PROMPT_PREFIX = """
+You are an expert QA engineer specializing in converting manual test cases to Gherkin scenarios.
+
+Convert the following manual test case to a proper Gherkin scenario format:
+
+```
+"""
+
+_GHERKIN_PROMPT_SUFFIX = """
+```
+
+**CRITICAL REQUIREMENTS:**
+1. **PRESERVE EXACT URLS**: Do NOT change any URLs. Keep them exactly as provided in the original text.
+2. **PRESERVE EXACT VALUES**: Keep all specific values (emails, passwords, amounts, names) exactly as written.
+3. **PRESERVE EXACT INSTRUCTIONS**: Keep the original wording and specific instructions intact.
+4. **NO GENERIC REPLACEMENTS**: Do not replace specific URLs with generic descriptions.
+
+**Gherkin Conversion Rules:**
+1. Use proper Gherkin syntax (Feature, Scenario, Given, When, Then, And)
+2. Convert action statements to appropriate Gherkin keywords:
+   - "Go to [URL]" → "Given I navigate to [EXACT_URL]"
+   - "Click on [element]" → "When I click on [EXACT_ELEMENT]"
+   - "Enter [value]" → "When I enter [EXACT_VALUE]"
+   - "Verify [condition]" → "Then I should see [EXACT_CONDITION]"
+3. Break down complex steps into smaller, testable steps
+4. Include proper assertions using "Then" and "And" statements
+5. Use descriptive scenario names based on the original test intent
+
+**EXAMPLES OF CORRECT CONVERSION:**
+Original: "Go to https://release-app.usemultiplier.com"
+Correct: "Given I navigate to https://release-app.usemultiplier.com"
+WRONG: "Given I am on the Multiplier login page"
+
+Original: "login with email:tester+bullertest@usemultiplier.com password:Password@123"
+Correct: "When I enter email 'tester+bullertest@usemultiplier.com' and password 'Password@123'"
+WRONG: "When I enter valid credentials"
+
+**Output Format:**
+Return only the Gherkin scenario without any additional explanation or markdown formatting.
+
+Convert the provided test case following these rules, ensuring ALL specific values and URLs remain unchanged.
+"""
+
 
 def _extract_model_name(llm) -> str:
-    """Extract the actual model name from LLM instance"""
+    """Extract the actual model name from LLM instance, cached per instance"""
+    key = id(llm)
+    cached = _MODEL_NAME_CACHE.get(key)
+    if cached is not None and cached[0]() is llm:
+        return cached[1]
+
+    model_name = _resolve_model_name(llm)
+    try:
+        # Drop the entry when the LLM is garbage collected so a reused id() can't hit a stale name
+        ref = weakref.ref(llm, lambda _, key=key: _MODEL_NAME_CACHE.pop(key, None))
+    except TypeError:
+        return model_name  # Not weak-referenceable; resolve on every call
+    _MODEL_NAME_CACHE[key] = (ref, model_name)
+    return model_name
+
+
+def _resolve_model_name(llm) -> str:
+    """Resolve the model name from the attributes of an LLM instance"""
     try:
         # Try different attributes where model name might be stored
         if hasattr(llm, 'model_id'):
@@ -49,15 +145,18 @@ def _extract_model_name(llm) -> str:
 
 def extract_code_content(text: str) -> str:
     """Extract code from markdown code blocks if present"""
-    # Look for content between triple backticks with optional language identifier
-    code_block_pattern = re.compile(r"```(?:python|gherkin|javascript|java|robot|markdown)?\n(.*?)```", re.DOTALL)
-    match = code_block_pattern.search(text)
+    match = _CODE_BLOCK_RE.search(text)
 
     if match:
         return match.group(1).strip()
     return text.strip()
 
 
+def _build_gherkin_prompt(manual_test_cases_text: str) -> str:
+    """Build the conversion prompt for one manual test case"""
+    return "".join((_GHERKIN_PROMPT_PREFIX, manual_test_cases_text, _GHERKIN_PROMPT_SUFFIX))
+
+
 def generate_gherkin_scenarios(manual_test_cases_text: str, llm: BaseChatModel) -> str:
     """
     Generate Gherkin scenarios from manual test cases using LLM
@@ -71,71 +170,91 @@ def generate_gherkin_scenarios(manual_test_cases_text: str, llm: BaseChatModel)
     """
     try:
         # Create prompt for Gherkin conversion
-        gherkin_prompt = f"""
-You are an expert QA engineer specializing in converting manual test cases to Gherkin scenarios.
+        gherkin_prompt = _build_gherkin_prompt(manual_test_cases_text)
 
-Convert the following manual test case to a proper Gherkin scenario format:
+        model_name = _extract_model_name(llm)
+        cache_key = prompt_cache_key(model_name, gherkin_prompt)
+        cached_content = _GHERKIN_CACHE.get(cache_key)
+        if cached_content is not None:
+            logger.info("Using cached Gherkin scenario")
+            return cached_content
 
-```
-{manual_test_cases_text}
-```
+        # Identical conversions already running in another thread are awaited instead of re-sent
+        with _INFLIGHT_LOCK:
+            inflight = _INFLIGHT.get(cache_key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = _INFLIGHT[cache_key] = Future()
+        if not is_owner:
+            logger.info("Waiting for identical in-flight Gherkin conversion")
+            return inflight.result()
 
-**CRITICAL REQUIREMENTS:**
-1. **PRESERVE EXACT URLS**: Do NOT change any URLs. Keep them exactly as provided in the original text.
-2. **PRESERVE EXACT VALUES**: Keep all specific values (emails, passwords, amounts, names) exactly as written.
-3. **PRESERVE EXACT INSTRUCTIONS**: Keep the original wording and specific instructions intact.
-4. **NO GENERIC REPLACEMENTS**: Do not replace specific URLs with generic descriptions.
+        try:
+            gherkin_content = _convert_to_gherkin(
+                manual_test_cases_text, gherkin_prompt, llm, model_name, cache_key
+            )
+            inflight.set_result(gherkin_content)
+            return gherkin_content
+        except BaseException as e:
+            inflight.set_exception(e)
+            raise
+        finally:
+            with _INFLIGHT_LOCK:
+                _INFLIGHT.pop(cache_key, None)
+        
+    except Exception as e:
+        logger.error(f"Error generating Gherkin scenarios: {str(e)}")
+        raise
 
-**Gherkin Conversion Rules:**
-1. Use proper Gherkin syntax (Feature, Scenario, Given, When, Then, And)
-2. Convert action statements to appropriate Gherkin keywords:
-   - "Go to [URL]" → "Given I navigate to [EXACT_URL]"
-   - "Click on [element]" → "When I click on [EXACT_ELEMENT]"
-   - "Enter [value]" → "When I enter [EXACT_VALUE]"
-   - "Verify [condition]" → "Then I should see [EXACT_CONDITION]"
-3. Break down complex steps into smaller, testable steps
-4. Include proper assertions using "Then" and "And" statements
-5. Use descriptive scenario names based on the original test intent
 
-**EXAMPLES OF CORRECT CONVERSION:**
-Original: "Go to https://release-app.usemultiplier.com"
-Correct: "Given I navigate to https://release-app.usemultiplier.com"
-WRONG: "Given I am on the Multiplier login page"
+def _convert_to_gherkin(
+    manual_test_cases_text: str,
+    gherkin_prompt: str,
+    llm: BaseChatModel,
+    model_name: str,
+    cache_key: str
+) -> str:
+    """Run the LLM conversion after an exact cache miss and store a usable result"""
+    # Near-duplicate test cases (reworded steps) can reuse an earlier conversion
+    similar_content, semantic_query = _SEMANTIC_CACHE.lookup(model_name, manual_test_cases_text)
+    if similar_content is not None:
+        logger.info("Using semantically cached Gherkin scenario")
+        return similar_content
 
-Original: "login with email:tester+bullertest@usemultiplier.com password:Password@123"
-Correct: "When I enter email 'tester+bullertest@usemultiplier.com' and password 'Password@123'"
-WRONG: "When I enter valid credentials"
+    # Generate Gherkin using LLM
+    response = llm.invoke([HumanMessage(content=gherkin_prompt)])
+    return _finish_conversion(gherkin_prompt, response.content, model_name, cache_key, semantic_query)
 
-**Output Format:**
-Return only the Gherkin scenario without any additional explanation or markdown formatting.
 
-Convert the provided test case following these rules, ensuring ALL specific values and URLs remain unchanged.
-"""
+def _finish_conversion(
+    gherkin_prompt: str,
+    response_content: str,
+    model_name: str,
+    cache_key: str,
+    semantic_query: Optional[SemanticQuery]
+) -> str:
+    """Extract, track and cache the Gherkin from one LLM response"""
+    gherkin_content = extract_code_content(response_content)
 
-        # Generate Gherkin using LLM
-        response = llm.invoke([HumanMessage(content=gherkin_prompt)])
-        gherkin_content = extract_code_content(response.content)
+    # Track token usage if available
+    try:
+        from workflow_use.hybrid.token_tracker import track_llm_call
+        # Estimate token usage (rough approximation: ~4 characters per token)
+        input_tokens = len(gherkin_prompt) // 4
+        output_tokens = len(gherkin_content) // 4
 
-        # Track token usage if available
-        try:
-            from workflow_use.hybrid.token_tracker import track_llm_call
-            # Estimate token usage (rough approximation)
-            input_tokens = len(gherkin_prompt.split()) * 1.3  # Rough token estimation
-            output_tokens = len(gherkin_content.split()) * 1.3
-
-            # Extract proper model name from LLM instance
-            model_name = _extract_model_name(llm)
-            track_llm_call(model_name, int(input_tokens), int(output_tokens))
-            logger.debug(f"Tracked Gherkin conversion: {model_name} - {int(input_tokens + output_tokens)} tokens")
-        except Exception as e:
-            logger.debug(f"Token tracking failed for Gherkin conversion: {e}")
-
-        logger.info("Successfully converted text to Gherkin scenario")
-        return gherkin_content
-        
+        track_llm_call(model_name, int(input_tokens), int(output_tokens), return_usage=False)
+        logger.debug(f"Tracked Gherkin conversion: {model_name} - {int(input_tokens + output_tokens)} tokens")
     except Exception as e:
-        logger.error(f"Error generating Gherkin scenarios: {str(e)}")
-        raise
+        logger.debug(f"Token tracking failed for Gherkin conversion: {e}")
+
+    # Only cache usable scenarios so a bad response isn't replayed on the next run
+    if validate_gherkin_scenario(gherkin_content):
+        _GHERKIN_CACHE.set(cache_key, gherkin_content)
+        _SEMANTIC_CACHE.add(model_name, semantic_query, gherkin_content)
+
+    logger.info("Successfully converted text to Gherkin scenario")
+    return gherkin_content
 
 
 def validate_gherkin_scenario(gherkin_text: str) -> bool:
@@ -149,22 +268,24 @@ def validate_gherkin_scenario(gherkin_text: str) -> bool:
         True if valid Gherkin format, False otherwise
     """
     try:
+        # Fast path: output that opens with its Feature and reaches a Scenario and step early
+        # is accepted without scanning the rest of the text
+        if (
+            gherkin_text[:_FAST_PATH_WINDOW].lstrip().startswith("Feature:")
+            and "Scenario:" in gherkin_text[:_FAST_PATH_WINDOW]
+            and _STEP_RE.search(gherkin_text, 0, _FAST_PATH_WINDOW)
+        ):
+            logger.info("Gherkin scenario validation passed")
+            return True
+
         # Check for required Gherkin keywords
-        required_patterns = [
-            r"Feature:\s*\w+",  # Feature declaration
-            r"Scenario:\s*\w+",  # Scenario declaration
-        ]
-        
-        for pattern in required_patterns:
-            if not re.search(pattern, gherkin_text, re.IGNORECASE):
-                logger.warning(f"Missing required Gherkin pattern: {pattern}")
+        for pattern in (_FEATURE_RE, _SCENARIO_RE):
+            if not pattern.search(gherkin_text):
+                logger.warning(f"Missing required Gherkin pattern: {pattern.pattern}")
                 return False
         
         # Check for at least one step keyword
-        step_keywords = ["Given", "When", "Then", "And", "But"]
-        has_steps = any(keyword in gherkin_text for keyword in step_keywords)
-        
-        if not has_steps:
+        if not _STEP_RE.search(gherkin_text):
             logger.warning("No Gherkin step keywords found")
             return False
             
@@ -187,8 +308,13 @@ def read_test_file(file_path: str) -> str:
         File content as string
     """
     try:
+        # Reject oversized files before reading them into memory
+        size = os.path.getsize(file_path)
+        if size > MAX_TXT_BYTES:
+            raise ValueError(f"Test file {file_path} is {size} bytes, larger than the {MAX_TXT_BYTES} byte limit")
+
         with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read().strip()
+            content = file.read(size).strip()
         
         if not content:
             raise ValueError(f"Test file {file_path} is empty")
@@ -215,20 +341,117 @@ def process_txt_to_gherkin(txt_file_path: str, llm: BaseChatModel) -> str:
     Returns:
         Valid Gherkin scenario text
     """
-    try:
-        # Read the test file
-        test_content = read_test_file(txt_file_path)
+    return process_txt_batch([txt_file_path], llm)[0]
+
+
+def process_txt_batch(file_paths: List[str], llm: BaseChatModel) -> List[str]:
+    """
+    Convert several .txt test files to Gherkin scenarios with one batched LLM call
+    
+    Files are read concurrently, cache hits are served without the LLM, and the remaining
+    prompts are sent together through llm.batch so their requests overlap.
+    
+    Args:
+        file_paths: Paths to the .txt test files
+        llm: Language model instance
         
-        # Convert to Gherkin
-        gherkin_scenario = generate_gherkin_scenarios(test_content, llm)
+    Returns:
+        Valid Gherkin scenario text for each file, in the same order as file_paths
+    """
+    if not file_paths:
+        return []
+    try:
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_CONCURRENCY, len(file_paths))) as executor:
+            test_contents = list(executor.map(read_test_file, file_paths))
         
-        # Validate the result
-        if not validate_gherkin_scenario(gherkin_scenario):
-            raise ValueError("Generated Gherkin scenario failed validation")
+        gherkin_scenarios = _generate_gherkin_batch(test_contents, llm)
         
-        logger.info(f"Successfully processed {txt_file_path} to Gherkin")
-        return gherkin_scenario
+        for file_path, gherkin_scenario in zip(file_paths, gherkin_scenarios):
+            if not validate_gherkin_scenario(gherkin_scenario):
+                raise ValueError(f"Generated Gherkin scenario for {file_path} failed validation")
+            logger.info(f"Successfully processed {file_path} to Gherkin")
+        return gherkin_scenarios
         
     except Exception as e:
         logger.error(f"Error processing txt to Gherkin: {e}")
         raise
+
+
+def _generate_gherkin_batch(manual_test_cases_texts: List[str], llm: BaseChatModel) -> List[str]:
+    """Batched counterpart of generate_gherkin_scenarios, sharing its caches and in-flight dedupe"""
+    model_name = _extract_model_name(llm)
+    prompts = [_build_gherkin_prompt(text) for text in manual_test_cases_texts]
+    cache_keys = [prompt_cache_key(model_name, prompt) for prompt in prompts]
+    
+    results: Dict[str, str] = {}
+    # cache_key -> (manual test case text, prompt) for exact cache misses, deduplicated within the batch
+    misses: Dict[str, Tuple[str, str]] = {}
+    for text, prompt, cache_key in zip(manual_test_cases_texts, prompts, cache_keys):
+        if cache_key in results or cache_key in misses:
+            continue
+        cached_content = _GHERKIN_CACHE.get(cache_key)
+        if cached_content is not None:
+            results[cache_key] = cached_content
+        else:
+            misses[cache_key] = (text, prompt)
+    if results:
+        logger.info(f"Using {len(results)} cached Gherkin scenario(s)")
+    
+    # Claim the misses; ones already being converted by another thread are awaited instead
+    owned: Dict[str, Future] = {}
+    awaited: Dict[str, Future] = {}
+    with _INFLIGHT_LOCK:
+        for cache_key in misses:
+            inflight = _INFLIGHT.get(cache_key)
+            if inflight is None:
+                owned[cache_key] = _INFLIGHT[cache_key] = Future()
+            else:
+                awaited[cache_key] = inflight
+    
+    try:
+        requests: List[Tuple[str, Optional[SemanticQuery]]] = []
+        for cache_key in owned:
+            text, prompt = misses[cache_key]
+            similar_content, semantic_query = _SEMANTIC_CACHE.lookup(model_name, text)
+            if similar_content is not None:
+                logger.info("Using semantically cached Gherkin scenario")
+                results[cache_key] = similar_content
+                owned[cache_key].set_result(similar_content)
+            else:
+                requests.append((cache_key, semantic_query))
+        
+        if requests:
+            responses = llm.batch(
+                [[HumanMessage(content=misses[cache_key][1])] for cache_key, _ in requests],
+                config={"max_concurrency": BATCH_MAX_CONCURRENCY},
+                return_exceptions=True
+            )
+            first_error: Optional[Exception] = None
+            for (cache_key, semantic_query), response in zip(requests, responses):
+                if isinstance(response, Exception):
+                    owned[cache_key].set_exception(response)
+                    first_error = first_error or response
+                    continue
+                gherkin_content = _finish_conversion(
+                    misses[cache_key][1], response.content, model_name, cache_key, semantic_query
+                )
+                results[cache_key] = gherkin_content
+                owned[cache_key].set_result(gherkin_content)
+            if first_error is not None:
+                raise first_error
+    except BaseException as e:
+        for inflight in owned.values():
+            if not inflight.done():
+                inflight.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            for cache_key in owned:
+                _INFLIGHT.pop(cache_key, None)
+    
+    if awaited:
+        logger.info(f"Waiting for {len(awaited)} identical in-flight Gherkin conversion(s)")
+        for cache_key, inflight in awaited.items():
+            results[cache_key] = inflight.result()
+    
+    return [results[cache_key] for cache_key in cache_keys]
@@ -4,358 +4,547 @@ Copied and adapted from smart-test framework for step-by-step assertion evaluati
 """
 
 import re
-import json
+import functools
 import logging
-from typing import Dict, List, Any, Tuple
+from itertools import chain
+from typing import Dict, FrozenSet, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
+try:
+    # google-re2 is optional; when installed, its linear-time engine scans the (untrusted, often long)
+    # agent output. Patterns compiled with it use inline flags and no look-around, which RE2 lacks.
+    import re2 as _re
+except ImportError:
+    _re = re
 
+logger = logging.getLogger(__name__)
 
-class StepTracker:
-    """Tracks individual Gherkin step execution and results"""
 
-    @staticmethod
-    def extract_step_results(history_data: Dict[str, Any], gherkin_content: str) -> List[Dict[str, Any]]:
-        """Extract step-by-step results from browser agent execution history"""
-        step_results = []
-
-        # Parse Gherkin steps
-        gherkin_steps = StepTracker._parse_gherkin_steps(gherkin_content)
-
-        # Extract step tracking from agent's extracted content and model actions
-        all_content = []
-
-        # Combine all sources of agent output
-        if 'extracted_content' in history_data:
-            all_content.extend(history_data['extracted_content'])
-
-        if 'model_actions' in history_data:
-            for action in history_data['model_actions']:
-                if isinstance(action, dict) and 'content' in action:
-                    all_content.append(action['content'])
-                elif isinstance(action, str):
-                    all_content.append(action)
-
-        # Join all content for analysis
-        content = '\n'.join(str(item) for item in all_content)
-
-        # Look for explicit step tracking patterns
-        step_starts = []
-        step_results_found = []
-        step_failures = []
-
-        for content_item in all_content:
-            if isinstance(content_item, str):
-                # Look for STEP_START patterns
-                step_start_matches = re.findall(r'STEP_START:\s*(.+?)(?=\n|$)', content_item, re.IGNORECASE)
-                step_starts.extend(step_start_matches)
-
-                # Look for STEP_RESULT patterns
-                step_result_matches = re.findall(r'STEP_RESULT:\s*(PASSED|FAILED)\s*-\s*(.+?)(?=\n|$)', content_item, re.IGNORECASE)
-                step_results_found.extend(step_result_matches)
-
-                # Look for STEP_FAILED patterns
-                step_failed_matches = re.findall(r'STEP_FAILED:\s*(.+?)(?=\n|$)', content_item, re.IGNORECASE)
-                for match in step_failed_matches:
-                    step_failures.append(('FAILED', match))
-
-                # Also look for step tracking in memory and goal patterns
-                memory_step_matches = re.findall(r'Steps? completed:.*?(\d+)\.(.*?)(?=\d+\.|Current|Next|$)', content_item, re.IGNORECASE | re.DOTALL)
-                for match in memory_step_matches:
-                    step_num, step_desc = match
-                    step_results_found.append(('PASSED', f'Step {step_num}: {step_desc.strip()}'))
-
-                # Look for goal patterns that indicate step completion
-                goal_matches = re.findall(r'Next goal:\s*STEP_START:\s*(.+?)(?=\n|$)', content_item, re.IGNORECASE)
-                step_starts.extend(goal_matches)
-
-                # Look for evaluation success patterns
-                eval_matches = re.findall(r'Eval:\s*Success\s*-\s*(.+?)(?=\n|$)', content_item, re.IGNORECASE)
-                for eval_match in eval_matches:
-                    step_results_found.append(('PASSED', eval_match.strip()))
-
-        # Also extract error information from browser action results
-        browser_errors = StepTracker._extract_browser_errors(history_data)
-
-        # Extract parsing errors and agent failures
-        parsing_errors = StepTracker._extract_parsing_errors(history_data)
-
-        # Combine all types of failures
-        all_failures = step_failures + browser_errors + parsing_errors
-
-        # If we have explicit step tracking, use it
-        if step_starts or step_results_found or all_failures:
-            step_results = StepTracker._process_explicit_step_tracking(
-                gherkin_steps, step_starts, step_results_found, all_failures
-            )
-        else:
-            # Fallback: infer step results from actions and content
-            step_results = StepTracker._infer_step_results_from_actions(
-                gherkin_steps, history_data
-            )
-
-        logger.info(f"StepTracker extracted {len(step_results)} step results from {len(gherkin_steps)} Gherkin steps")
-        return step_results
-
-    @staticmethod
-    def _parse_gherkin_steps(gherkin_content: str) -> List[str]:
-        """Parse Gherkin content to extract individual steps"""
-        steps = []
-        lines = gherkin_content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            # Look for Gherkin step keywords
-            if re.match(r'^\s*(Given|When|Then|And|But)\s+', line, re.IGNORECASE):
-                steps.append(line)
-        
-        return steps
-
-    @staticmethod
-    def _extract_browser_errors(history_data: Dict[str, Any]) -> List[Tuple[str, str]]:
-        """Extract browser-specific errors from history data"""
-        errors = []
-        
-        # Check for browser action failures
-        if 'extracted_content' in history_data:
-            for content in history_data['extracted_content']:
+def _engine_text(text: str) -> str:
+    """Make text safe for the pattern engine; re2 encodes to UTF-8, which rejects lone surrogates"""
+    if _re is re or text.isascii():
+        return text
+    try:
+        text.encode('utf-8')
+    except UnicodeEncodeError:
+        # JSON-decoded DOM text can carry lone surrogates; keep them visible as escapes
+        return text.encode('utf-8', 'backslashreplace').decode('utf-8')
+    return text
+
+# Step tracking markers the browser agent is prompted to emit; '.' stops at a newline,
+# so each capture runs to the end of its line
+_STEP_START_RE = _re.compile(r'(?i)STEP_START:\s*(.+)')
+_STEP_RESULT_RE = _re.compile(r'(?i)STEP_RESULT:\s*(PASSED|FAILED)\s*-\s*(.+)')
+_STEP_FAILED_RE = _re.compile(r'(?i)STEP_FAILED:\s*(.+)')
+# Step progress reported in the agent's memory, goal and evaluation fields; the memory
+# pattern needs a look-ahead, so it always uses the standard library engine. Its lazy gaps
+# are bounded, so a marker with no numbered step after it fails fast instead of rescanning
+# the rest of the content; the lead gap may cross lines (a summary line often comes first),
+# the description ends at the end of its line.
+_MEMORY_STEP_RE = re.compile(
+    r'Steps? completed:[\s\S]{0,500}?(\d+)\.([^\n]{0,500}?)(?=\d+\.|Current|Next|\n|$)',
+    re.IGNORECASE
+)
+_GOAL_RE = _re.compile(r'(?i)Next goal:\s*STEP_START:\s*(.+)')
+_EVAL_RE = _re.compile(r'(?i)Eval:\s*Success\s*-\s*(.+)')
+# Leading Gherkin keyword of a step line
+_GHERKIN_KW_RE = _re.compile(r'(?i)^\s*(Given|When|Then|And|But)\s+')
+# A whole step line within Gherkin content: keyword, whitespace, then step text
+_GHERKIN_LINE_RE = _re.compile(r'(?im)^[^\S\n]*(?:Given|When|Then|And|But)[^\S\n]+\S.*$')
+# "Step N:" prefix of a tracked message
+_STEP_PREFIX_RE = _re.compile(r'^(step \d+:?\s*)')
+
+# Lowercase phrases in extracted content that mean a browser action failed
+_BROWSER_ERROR_INDICATORS = (
+    'element not found', 'timeout', 'failed to click', 'failed to type',
+    'navigation failed', 'page load failed'
+)
+
+# Ordered keyword rules: (alternatives, value). A rule matches when every keyword of any one
+# alternative occurs in the lowercased text; the first matching rule wins, so order is priority.
+_KeywordRules = Tuple[Tuple[Tuple[Tuple[str, ...], ...], str], ...]
+
+# Agent errors reported as step failures, labelled for the failure message
+_AGENT_ERROR_LABELS: _KeywordRules = (
+    ((('failed to parse',), ('could not parse',)), 'Parsing error'),
+    ((('result failed',),), 'Agent execution failed'),
+)
+
+# Agent errors by kind, for choosing the inferred failure message
+_AGENT_ERROR_KINDS: _KeywordRules = (
+    ((('failed to parse',), ('could not parse',)), 'parsing'),
+    ((('result failed',),), 'agent'),
+    ((('task completed without success',), ('blocker encountered',)), 'task_completion'),
+)
+
+# Failure messages by error category
+_ERROR_CATEGORIES: _KeywordRules = (
+    ((('blocker encountered',), ('unable to proceed',)),
+     'Business logic blocker - execution stopped due to data conflicts or validation errors'),
+    ((('task completed without success',),),
+     'Task execution failed - completed but did not achieve success criteria'),
+    ((('email conflict',), ('already has an ongoing contract',)),
+     'Data conflict error - duplicate or conflicting data prevented operation completion'),
+    ((('element not found',), ('no such element',)),
+     'Element location failed - target element not found on page'),
+    ((('timeout',),),
+     'Operation timeout - element or condition not met within time limit'),
+    ((('click', 'failed'),),
+     'Click action failed - element not clickable or interaction blocked'),
+    ((('type', 'failed'),),
+     'Text input failed - field not accessible or input rejected'),
+    ((('navigation', 'failed'),),
+     'Page navigation failed - URL unreachable or redirect issue'),
+    ((('parse', 'failed'),),
+     'AI model parsing error - response format issue or token limit exceeded'),
+)
+
+# Phrases in tracked messages that mean the scenario as a whole failed
+# ('execution incomplete' also covers 'gherkin scenario execution incomplete')
+_OVERALL_FAILURE_PHRASES = ('task completed without success', 'blocker encountered', 'execution incomplete')
+
+
+def _match_keyword_rules(text_lower: str, rules: _KeywordRules) -> Optional[str]:
+    """Return the value of the first rule whose keywords occur in text_lower, or None"""
+    for alternatives, value in rules:
+        for keywords in alternatives:
+            if all(keyword in text_lower for keyword in keywords):
+                return value
+    return None
+
+
+# Gherkin step keywords, as they appear after lowercasing
+_GHERKIN_KEYWORDS = frozenset(('given', 'when', 'then', 'and', 'but'))
+
+# Normalized strings shorter than this are too generic to count as a step match by containment
+_MIN_SUBSTRING_MATCH_LEN = 4
+# Word overlap above which a tracked message matches a step
+_SIMILARITY_THRESHOLD = 0.6
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_gherkin_step(gherkin_step: str) -> str:
+    """Lowercase a Gherkin step without its leading keyword"""
+    return _GHERKIN_KW_RE.sub('', gherkin_step).lower()
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_tracked_message(tracked_message: str) -> str:
+    """Lowercase a tracked message without its "Step N:" prefix"""
+    return _STEP_PREFIX_RE.sub('', tracked_message.lower())
+
+
+@functools.lru_cache(maxsize=4096)
+def _similarity_sets(text: str) -> FrozenSet[str]:
+    """Word set of a normalized string, as compared by _jaccard"""
+    return frozenset(text.split())
+
+
+def _jaccard(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Word overlap of two word sets; two empty sets count as identical"""
+    if not words1 and not words2:
+        return 1.0
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+# One scan for every marker the patterns above anchor on; the group that matched says which
+# of them can produce results for a content item, so the rest are never run. With the standard
+# library engine a leading look-ahead lets it skip ahead to candidate first letters instead of
+# trying each branch everywhere; RE2 needs no such help.
+_MARKER_RE = _re.compile(
+    r'(?i)' + (r'(?=[se])' if _re is re else '') +
+    r'(?:STEP_(?:(?P<start>START)|(?P<result>RESULT)|(?P<failed>FAILED)):'
+    r'|(?P<memory>Steps? completed:)|(?P<eval>Eval:))'
+)
+
+
+def extract_step_results(history_data: Dict[str, Any], gherkin_content: str) -> List[Dict[str, Any]]:
+    """Extract step-by-step results from browser agent execution history"""
+    step_results = []
+
+    # Parse Gherkin steps
+    gherkin_steps = _parse_gherkin_steps(gherkin_content)
+
+    # Look for explicit step tracking patterns
+    step_starts = []
+    step_results_found = []
+    step_failures = []
+
+    # Bind the pattern methods once; they run for every content item
+    find_markers = _MARKER_RE.finditer
+    find_step_starts = _STEP_START_RE.findall
+    find_step_results = _STEP_RESULT_RE.findall
+    find_step_failures = _STEP_FAILED_RE.findall
+    find_memory_steps = _MEMORY_STEP_RE.findall
+    find_goals = _GOAL_RE.findall
+    find_evals = _EVAL_RE.findall
+
+    # Agents repeat content across steps (memory summaries, waiting messages); scan each distinct
+    # string once and replay its matches on repeats, which still count towards the step order
+    matches_by_content: Dict[str, Tuple[List[str], List[Tuple[str, str]], List[Tuple[str, str]]]] = {}
+
+    # Extract step tracking from agent's extracted content and model actions, streamed one item at a time
+    for content_item in map(_engine_text, _iter_content(history_data)):
+        item_matches = matches_by_content.get(content_item)
+        if item_matches is None:
+            item_matches = matches_by_content[content_item] = ([], [], [])
+            item_starts, item_results, item_failures = item_matches
+
+            # Most content has no step markers at all; find out which ones are present in one pass
+            markers = {match.lastgroup for match in find_markers(content_item)}
+
+            # Look for STEP_START patterns
+            if 'start' in markers:
+                item_starts.extend(find_step_starts(content_item))
+
+            # Look for STEP_RESULT patterns
+            if 'result' in markers:
+                item_results.extend(find_step_results(content_item))
+
+            # Look for STEP_FAILED patterns
+            if 'failed' in markers:
+                for match in find_step_failures(content_item):
+                    item_failures.append(('FAILED', match))
+
+            # Also look for step tracking in memory and goal patterns
+            if 'memory' in markers:
+                for step_num, step_desc in find_memory_steps(content_item):
+                    item_results.append(('PASSED', f'Step {step_num}: {step_desc.strip()}'))
+
+            # Look for goal patterns that indicate step completion
+            if 'start' in markers:
+                item_starts.extend(find_goals(content_item))
+
+            # Look for evaluation success patterns
+            if 'eval' in markers:
+                for eval_match in find_evals(content_item):
+                    item_results.append(('PASSED', eval_match.strip()))
+
+        item_starts, item_results, item_failures = item_matches
+        step_starts.extend(item_starts)
+        step_results_found.extend(item_results)
+        step_failures.extend(item_failures)
+
+    # Also extract error information from browser action results
+    browser_errors = _extract_browser_errors(history_data)
+
+    # Extract parsing errors and agent failures
+    parsing_errors = _extract_parsing_errors(history_data)
+
+    # Combine all types of failures
+    all_failures = step_failures + browser_errors + parsing_errors
+
+    # If we have explicit step tracking, use it
+    if step_starts or step_results_found or all_failures:
+        step_results = _process_explicit_step_tracking(
+            gherkin_steps, step_starts, step_results_found, all_failures
+        )
+    else:
+        # Fallback: infer step results from actions and content
+        step_results = _infer_step_results_from_actions(
+            gherkin_steps, history_data
+        )
+
+    logger.info(f"StepTracker extracted {len(step_results)} step results from {len(gherkin_steps)} Gherkin steps")
+    return step_results
+
+
+def _iter_strings(items) -> Iterator[str]:
+    """Yield the string items of a history list, skipping anything else"""
+    for item in items:
+        if isinstance(item, str):
+            yield item
+
+
+def _iter_content(history_data: Dict[str, Any]) -> Iterator[str]:
+    """Yield all sources of agent output as strings: extracted content, then model action content"""
+    yield from _iter_strings(history_data.get('extracted_content', []))
+
+    for action in history_data.get('model_actions', []):
+        if isinstance(action, str):
+            yield action
+        elif isinstance(action, dict):
+            content = action.get('content')
+            if content and isinstance(content, str):
+                yield content
+
+
+def _parse_gherkin_steps(gherkin_content: str) -> List[str]:
+    """Parse Gherkin content to extract individual steps"""
+    # Look for Gherkin step keywords in one scan instead of splitting into lines
+    return [match.group(0).strip() for match in _GHERKIN_LINE_RE.finditer(_engine_text(gherkin_content))]
+
+
+def _extract_browser_errors(history_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Extract browser-specific errors from history data"""
+    errors = []
+    
+    # Check for browser action failures
+    for content in _iter_strings(history_data.get('extracted_content', [])):
+        content_lower = content.lower()
+        if any(error_indicator in content_lower for error_indicator in _BROWSER_ERROR_INDICATORS):
+            errors.append(('FAILED', f'Browser action failed: {content[:100]}...'))
+    
+    return errors
+
+
+def _extract_parsing_errors(history_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Extract parsing and agent errors from history data"""
+    errors = []
+    
+    # Check for parsing failures
+    for error in _iter_strings(history_data.get('errors', [])):
+        label = _match_keyword_rules(error.lower(), _AGENT_ERROR_LABELS)
+        if label is not None:
+            errors.append(('FAILED', f'{label}: {error}'))
+    
+    return errors
+
+
+def _process_explicit_step_tracking(
+    gherkin_steps: List[str],
+    step_starts: List[str],
+    step_results_found: List[Tuple[str, str]],
+    all_failures: List[Tuple[str, str]]
+) -> List[Dict[str, Any]]:
+    """Process explicit step tracking information"""
+    step_results = []
+    # All steps of one extraction share a timestamp
+    timestamp = datetime.now().isoformat()
+
+    # Check if there are any overall failure indicators
+    has_overall_failure = False
+    for _, message in chain(step_results_found, all_failures):
+        message_lower = message.lower()
+        if any(phrase in message_lower for phrase in _OVERALL_FAILURE_PHRASES):
+            has_overall_failure = True
+            break
+
+    # Normalize every step and message once instead of once per comparison
+    gherkin_normalized = [_normalize_gherkin_step(step) for step in gherkin_steps]
+    results_normalized = [_normalize_tracked_message(message) for _, message in step_results_found]
+    failures_normalized = [_normalize_tracked_message(message) for _, message in all_failures]
+    gherkin_sets = [_similarity_sets(text) for text in gherkin_normalized]
+    results_sets = [_similarity_sets(text) for text in results_normalized]
+    failures_sets = [_similarity_sets(text) for text in failures_normalized]
+    results_by_signature = _index_by_signature(results_normalized)
+    failures_by_signature = _index_by_signature(failures_normalized)
+
+    # Pair each step with the first tracked result that matches its content
+    matched_results: List[Optional[int]] = []
+    for step_normalized, step_words in zip(gherkin_normalized, gherkin_sets):
+        matched_results.append(_find_tracked_match(
+            step_normalized, step_words, results_by_signature, results_normalized, results_sets
+        ))
+
+    # Safety net for results that don't echo their step: pair the steps left unmatched with the
+    # results no step matched, in execution order
+    claimed_results = set(matched_results)
+    unmatched_steps = [i for i, j in enumerate(matched_results) if j is None]
+    unclaimed_results = [j for j in range(len(step_results_found)) if j not in claimed_results]
+    for i, j in zip(unmatched_steps, unclaimed_results):
+        matched_results[i] = j
+
+    for i, step in enumerate(gherkin_steps):
+        # Default status depends on whether there's an overall failure
+        default_status = 'FAILED' if has_overall_failure else 'PASSED'
+        default_message = ('Step likely failed due to overall execution failure' if has_overall_failure
+                         else 'Step executed successfully')
+
+        step_info = {
+            'step_number': i + 1,
+            'step_text': step,
+            'status': default_status,
+            'message': default_message,
+            'timestamp': timestamp,
+            'execution_order': i + 1
+        }
+
+        # Apply the matching step result, if any
+        j = matched_results[i]
+        if j is not None:
+            status, message = step_results_found[j]
+            # If there's an overall failure, don't override with PASSED
+            if has_overall_failure and status.upper() == 'PASSED':
+                # Keep the default FAILED status but update the message
+                step_info['message'] = f"Step tracking shows PASSED but overall execution failed: {message.strip()}"
+            else:
+                step_info['status'] = status.upper()
+                step_info['message'] = message.strip()
+
+        # Check for failures (these always override)
+        j = _find_tracked_match(
+            gherkin_normalized[i], gherkin_sets[i], failures_by_signature, failures_normalized, failures_sets
+        )
+        if j is not None:
+            step_info['status'] = 'FAILED'
+            step_info['message'] = all_failures[j][1].strip()
+
+        step_results.append(step_info)
+
+    return step_results
+
+
+def _step_signature(normalized: str) -> Tuple[str, ...]:
+    """First three words of a normalized step or message, ignoring a leading Gherkin keyword"""
+    words = normalized.split(None, 4)
+    if words and words[0] in _GHERKIN_KEYWORDS:
+        words = words[1:]
+    return tuple(words[:3])
+
+
+def _index_by_signature(normalized_messages: List[str]) -> Dict[Tuple[str, ...], List[int]]:
+    """Map each signature to the indexes of the messages that have it, in order"""
+    index: Dict[Tuple[str, ...], List[int]] = {}
+    for j, normalized in enumerate(normalized_messages):
+        index.setdefault(_step_signature(normalized), []).append(j)
+    return index
+
+
+def _find_tracked_match(
+    step_normalized: str,
+    step_words: FrozenSet[str],
+    by_signature: Dict[Tuple[str, ...], List[int]],
+    normalized_messages: List[str],
+    message_sets: List[FrozenSet[str]]
+) -> Optional[int]:
+    """Index of the tracked message matching a step, preferring messages that open with the step's words"""
+    candidates = by_signature.get(_step_signature(step_normalized), ())
+    for j in candidates:
+        if _prepared_steps_match(step_normalized, step_words, normalized_messages[j], message_sets[j]):
+            return j
+
+    # Signature miss: compare against the remaining messages
+    for j, (normalized, words) in enumerate(zip(normalized_messages, message_sets)):
+        if j not in candidates and _prepared_steps_match(step_normalized, step_words, normalized, words):
+            return j
+    return None
+
+
+def _prepared_steps_match(
+    gherkin_normalized: str,
+    gherkin_words: FrozenSet[str],
+    tracked_normalized: str,
+    tracked_words: FrozenSet[str]
+) -> bool:
+    """Match normalized strings whose word sets have already been built"""
+    # Check for substantial overlap
+    if (min(len(gherkin_normalized), len(tracked_normalized)) >= _MIN_SUBSTRING_MATCH_LEN and
+            (gherkin_normalized in tracked_normalized or tracked_normalized in gherkin_normalized)):
+        return True
+
+    # Overlap can't exceed the smaller word set's share of the larger, so skip size-mismatched pairs
+    smaller, larger = sorted((len(gherkin_words), len(tracked_words)))
+    if larger and smaller <= _SIMILARITY_THRESHOLD * larger:
+        return False
+    return _jaccard(gherkin_words, tracked_words) > _SIMILARITY_THRESHOLD
+
+
+def _infer_step_results_from_actions(gherkin_steps: List[str], history_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Infer step results from browser actions and content when explicit tracking is not available"""
+    step_results = []
+    # All steps of one extraction share a timestamp
+    timestamp = datetime.now().isoformat()
+
+    # Get overall execution status
+    overall_status = 'PASSED'  # Default assumption
+
+    # Check for final status indicators first
+    final_status_indicators = history_data.get('final_status_indicators', [])
+    if 'FAILED' in final_status_indicators:
+        overall_status = 'FAILED'
+        logger.info("Overall status set to FAILED based on final status indicators")
+
+    # Check for errors in history
+    errors = history_data.get('errors', [])
+    parsing_failures = False
+    agent_failures = False
+    task_completion_failures = False
+
+    for error in _iter_strings(errors):
+        overall_status = 'FAILED'
+        error_kind = _match_keyword_rules(error.lower(), _AGENT_ERROR_KINDS)
+        if error_kind == 'parsing':
+            parsing_failures = True
+        elif error_kind == 'agent':
+            agent_failures = True
+        elif error_kind == 'task_completion':
+            task_completion_failures = True
+            logger.info(f"Task completion failure detected: {error[:100]}...")
+
+    # Extract actions and content
+    actions = history_data.get('model_actions', [])
+    extracted_content = history_data.get('extracted_content', [])
+
+    # Create step results based on available information
+    for i, step in enumerate(gherkin_steps):
+        step_info = {
+            'step_number': i + 1,
+            'step_text': step,
+            'status': 'INFERRED',  # Will be updated based on analysis
+            'message': 'Step status inferred from execution',
+            'timestamp': timestamp,
+            'execution_order': i + 1
+        }
+
+        # Try to match step with actions
+        if i < len(actions):
+            action_name = actions[i] if isinstance(actions[i], str) else str(actions[i])
+            step_info['message'] = f'Executed action: {action_name}'
+
+            # Check if there's corresponding content
+            if i < len(extracted_content):
+                content = extracted_content[i]
                 if isinstance(content, str):
                     content_lower = content.lower()
-                    if any(error_indicator in content_lower for error_indicator in [
-                        'element not found', 'timeout', 'failed to click', 'failed to type',
-                        'navigation failed', 'page load failed'
-                    ]):
-                        errors.append(('FAILED', f'Browser action failed: {content[:100]}...'))
-        
-        return errors
-
-    @staticmethod
-    def _extract_parsing_errors(history_data: Dict[str, Any]) -> List[Tuple[str, str]]:
-        """Extract parsing and agent errors from history data"""
-        errors = []
-        
-        # Check for parsing failures
-        if 'errors' in history_data:
-            for error in history_data['errors']:
-                if isinstance(error, str):
-                    error_lower = error.lower()
-                    if 'failed to parse' in error_lower or 'could not parse' in error_lower:
-                        errors.append(('FAILED', f'Parsing error: {error}'))
-                    elif 'result failed' in error_lower:
-                        errors.append(('FAILED', f'Agent execution failed: {error}'))
-        
-        return errors
-
-    @staticmethod
-    def _process_explicit_step_tracking(
-        gherkin_steps: List[str],
-        step_starts: List[str],
-        step_results_found: List[Tuple[str, str]],
-        all_failures: List[Tuple[str, str]]
-    ) -> List[Dict[str, Any]]:
-        """Process explicit step tracking information"""
-        step_results = []
-
-        # Check if there are any overall failure indicators
-        has_overall_failure = any('task completed without success' in message.lower() or
-                                'blocker encountered' in message.lower() or
-                                'execution incomplete' in message.lower() or
-                                'gherkin scenario execution incomplete' in message.lower()
-                                for _, message in step_results_found + all_failures)
-
-        for i, step in enumerate(gherkin_steps):
-            # Default status depends on whether there's an overall failure
-            default_status = 'FAILED' if has_overall_failure else 'PASSED'
-            default_message = ('Step likely failed due to overall execution failure' if has_overall_failure
-                             else 'Step executed successfully')
-
-            step_info = {
-                'step_number': i + 1,
-                'step_text': step,
-                'status': default_status,
-                'message': default_message,
-                'timestamp': datetime.now().isoformat(),
-                'execution_order': i + 1
-            }
-
-            # Check if this step was explicitly tracked
-            step_found = False
-
-            # Look for matching step in results
-            for j, (status, message) in enumerate(step_results_found):
-                if StepTracker._steps_match(step, message) or i == j:
-                    # If there's an overall failure, don't override with PASSED
-                    if has_overall_failure and status.upper() == 'PASSED':
-                        # Keep the default FAILED status but update the message
-                        step_info['message'] = f"Step tracking shows PASSED but overall execution failed: {message.strip()}"
-                    else:
-                        step_info['status'] = status.upper()
-                        step_info['message'] = message.strip()
-                    step_found = True
-                    break
-
-            # Check for failures (these always override)
-            for status, message in all_failures:
-                if StepTracker._steps_match(step, message):
-                    step_info['status'] = 'FAILED'
-                    step_info['message'] = message.strip()
-                    step_found = True
-                    break
-
-            step_results.append(step_info)
-
-        return step_results
-
-    @staticmethod
-    def _steps_match(gherkin_step: str, tracked_message: str) -> bool:
-        """Check if a Gherkin step matches a tracked message"""
-        # Normalize both strings for comparison
-        gherkin_normalized = re.sub(r'^\s*(Given|When|Then|And|But)\s+', '', gherkin_step, flags=re.IGNORECASE).lower()
-        tracked_normalized = tracked_message.lower()
-
-        # Remove common prefixes from tracked message
-        tracked_normalized = re.sub(r'^(step \d+:?\s*)', '', tracked_normalized)
-
-        # Check for substantial overlap
-        return (gherkin_normalized in tracked_normalized or
-                tracked_normalized in gherkin_normalized or
-                StepTracker._calculate_similarity(gherkin_normalized, tracked_normalized) > 0.6)
-
-    @staticmethod
-    def _calculate_similarity(str1: str, str2: str) -> float:
-        """Calculate similarity between two strings using simple word overlap"""
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-
-        if not words1 and not words2:
-            return 1.0
-        if not words1 or not words2:
-            return 0.0
-
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-
-        return len(intersection) / len(union)
-
-    @staticmethod
-    def _infer_step_results_from_actions(gherkin_steps: List[str], history_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Infer step results from browser actions and content when explicit tracking is not available"""
-        step_results = []
-
-        # Get overall execution status
-        overall_status = 'PASSED'  # Default assumption
-
-        # Check for final status indicators first
-        final_status_indicators = history_data.get('final_status_indicators', [])
-        if 'FAILED' in final_status_indicators:
-            overall_status = 'FAILED'
-            logger.info("Overall status set to FAILED based on final status indicators")
-
-        # Check for errors in history
-        errors = history_data.get('errors', [])
-        parsing_failures = False
-        agent_failures = False
-        task_completion_failures = False
-
-        for error in errors:
-            if isinstance(error, str):
-                error_lower = error.lower()
-                if 'failed to parse' in error_lower or 'could not parse' in error_lower:
-                    parsing_failures = True
-                    overall_status = 'FAILED'
-                elif 'result failed' in error_lower:
-                    agent_failures = True
-                    overall_status = 'FAILED'
-                elif 'task completed without success' in error_lower or 'blocker encountered' in error_lower:
-                    task_completion_failures = True
-                    overall_status = 'FAILED'
-                    logger.info(f"Task completion failure detected: {error[:100]}...")
-                else:
-                    overall_status = 'FAILED'
-
-        # Extract actions and content
-        actions = history_data.get('model_actions', [])
-        extracted_content = history_data.get('extracted_content', [])
-
-        # Create step results based on available information
-        for i, step in enumerate(gherkin_steps):
-            step_info = {
-                'step_number': i + 1,
-                'step_text': step,
-                'status': 'INFERRED',  # Will be updated based on analysis
-                'message': 'Step status inferred from execution',
-                'timestamp': datetime.now().isoformat(),
-                'execution_order': i + 1
-            }
-
-            # Try to match step with actions
-            if i < len(actions):
-                action_name = actions[i] if isinstance(actions[i], str) else str(actions[i])
-                step_info['message'] = f'Executed action: {action_name}'
-
-                # Check if there's corresponding content
-                if i < len(extracted_content):
-                    content = extracted_content[i]
-                    if isinstance(content, str):
-                        if 'error' in content.lower() or 'failed' in content.lower():
-                            step_info['status'] = 'FAILED'
-                            # Use the error categorization for better failure messages
-                            step_info['message'] = StepTracker._categorize_error(content)
-                        else:
-                            step_info['status'] = 'PASSED'
-                            step_info['message'] = f'Completed: {content[:100]}...'
-
-            # If we couldn't determine status from actions, use overall status
-            if step_info['status'] == 'INFERRED':
-                if overall_status == 'FAILED':
-                    if task_completion_failures:
-                        step_info['status'] = 'FAILED'
-                        step_info['message'] = 'Task execution blocked - unable to complete due to business logic constraints or data conflicts'
-                    elif parsing_failures:
-                        step_info['status'] = 'FAILED'
-                        step_info['message'] = 'AI model parsing error - response could not be processed (possible token limit or format issue)'
-                    elif agent_failures:
+                    if 'error' in content_lower or 'failed' in content_lower:
                         step_info['status'] = 'FAILED'
-                        step_info['message'] = 'AI agent failed after multiple retry attempts - persistent execution issue'
-                    elif i == len(gherkin_steps) - 1:
-                        # Last step likely failed if overall failed
-                        step_info['status'] = 'FAILED'
-                        step_info['message'] = 'Step likely failed based on overall execution result'
+                        # Use the error categorization for better failure messages
+                        step_info['message'] = _categorize_error(content)
                     else:
-                        # Earlier steps might have passed before the failure
                         step_info['status'] = 'PASSED'
-                        step_info['message'] = 'Step likely passed before failure occurred'
+                        step_info['message'] = f'Completed: {content[:100]}...'
+
+        # If we couldn't determine status from actions, use overall status
+        if step_info['status'] == 'INFERRED':
+            if overall_status == 'FAILED':
+                if task_completion_failures:
+                    step_info['status'] = 'FAILED'
+                    step_info['message'] = 'Task execution blocked - unable to complete due to business logic constraints or data conflicts'
+                elif parsing_failures:
+                    step_info['status'] = 'FAILED'
+                    step_info['message'] = 'AI model parsing error - response could not be processed (possible token limit or format issue)'
+                elif agent_failures:
+                    step_info['status'] = 'FAILED'
+                    step_info['message'] = 'AI agent failed after multiple retry attempts - persistent execution issue'
+                elif i == len(gherkin_steps) - 1:
+                    # Last step likely failed if overall failed
+                    step_info['status'] = 'FAILED'
+                    step_info['message'] = 'Step likely failed based on overall execution result'
                 else:
+                    # Earlier steps might have passed before the failure
                     step_info['status'] = 'PASSED'
-                    step_info['message'] = 'Step completed successfully (inferred from overall success)'
-
-            step_results.append(step_info)
-
-        return step_results
-
-    @staticmethod
-    def _categorize_error(error_content: str) -> str:
-        """Categorize error content for better failure messages"""
-        error_lower = error_content.lower()
-
-        if 'blocker encountered' in error_lower or 'unable to proceed' in error_lower:
-            return 'Business logic blocker - execution stopped due to data conflicts or validation errors'
-        elif 'task completed without success' in error_lower:
-            return 'Task execution failed - completed but did not achieve success criteria'
-        elif 'email conflict' in error_lower or 'already has an ongoing contract' in error_lower:
-            return 'Data conflict error - duplicate or conflicting data prevented operation completion'
-        elif 'element not found' in error_lower or 'no such element' in error_lower:
-            return 'Element location failed - target element not found on page'
-        elif 'timeout' in error_lower:
-            return 'Operation timeout - element or condition not met within time limit'
-        elif 'click' in error_lower and 'failed' in error_lower:
-            return 'Click action failed - element not clickable or interaction blocked'
-        elif 'type' in error_lower and 'failed' in error_lower:
-            return 'Text input failed - field not accessible or input rejected'
-        elif 'navigation' in error_lower and 'failed' in error_lower:
-            return 'Page navigation failed - URL unreachable or redirect issue'
-        elif 'parse' in error_lower and 'failed' in error_lower:
-            return 'AI model parsing error - response format issue or token limit exceeded'
-        else:
-            return f'Execution error: {error_content[:100]}...'
+                    step_info['message'] = 'Step likely passed before failure occurred'
+            else:
+                step_info['status'] = 'PASSED'
+                step_info['message'] = 'Step completed successfully (inferred from overall success)'
+
+        step_results.append(step_info)
+
+    return step_results
+
+
+def _categorize_error(error_content: str) -> str:
+    """Categorize error content for better failure messages"""
+    category = _match_keyword_rules(error_content.lower(), _ERROR_CATEGORIES)
+    if category is not None:
+        return category
+    return f'Execution error: {error_content[:100]}...'
+
+
+class StepTracker:
+    """Tracks individual Gherkin step execution and results"""
+
+    extract_step_results = staticmethod(extract_step_results)
@@ -0,0 +1,54 @@
+import pytest
+
+from workflow_use.smart_test.step_tracker import extract_step_results
+
+GHERKIN = """Feature: Login
+  Scenario: User logs in
+    Given I navigate to https://x.com
+    When I log in
+"""
+
+
+@pytest.mark.parametrize(
+	'memory',
+	[
+		'Steps completed: navigated to the site\n1. Navigate to https://x.com',
+		'Memory: Steps completed:\nNavigated to the page\n1. Navigate to https://x.com\nNext: log in',
+	],
+)
+def test_memory_steps_after_multiline_summary(memory):
+	"""
+	Tests that numbered steps in a memory block are found when a summary line sits between them and the marker.
+	"""
+	results = extract_step_results({'extracted_content': [memory]}, GHERKIN)
+
+	assert results[0]['status'] == 'PASSED'
+	assert results[0]['message'] == 'Step 1: Navigate to https://x.com'
+
+
+def test_repeated_content_keeps_result_order():
+	"""
+	Tests that a repeated result still counts, so later results stay on their own steps.
+	"""
+	history = {
+		'extracted_content': [
+			'STEP_RESULT: PASSED - ok',
+			'STEP_RESULT: PASSED - ok',
+			'STEP_RESULT: FAILED - nope',
+		]
+	}
+
+	results = extract_step_results(history, 'Given a\nWhen b\nThen c\n')
+
+	assert [result['status'] for result in results] == ['PASSED', 'PASSED', 'FAILED']
+
+
+def test_lone_surrogate_in_content():
+	"""
+	Tests that content with a lone surrogate (JSON-decoded DOM text) is still scanned.
+	"""
+	history = {'extracted_content': ['Clicked \ud800 button\nSTEP_RESULT: PASSED - ok']}
+
+	results = extract_step_results(history, 'Given a\n')
+
+	assert results[0]['status'] == 'PASSED'